@@ -11,11 +11,31 @@ This package contains the core modules for the Audio Sample Organizer:
 __version__ = '0.0.1'
 __author__ = 'Oscar de la Fuente Ruiz 25/02/2025'
 
-# Import key components for easier access
-from .analyzer import AudioAnalyzer, AudioFeatures
-from .classifier import PatternMatcher, ClassificationResult
-from .processor import AudioFileProcessor
-from .utils import setup_logging, load_config, check_audio_libraries
+import importlib
 
-# Check for required libraries
-audio_analysis_available = check_audio_libraries()
\ No newline at end of file
+# Key components, imported from their submodules on first access so that light
+# users of the package (the progress monitors import only modules.utils) do not
+# load the audio libraries
+_EXPORTS = {
+    'AudioAnalyzer': 'analyzer',
+    'AudioFeatures': 'analyzer',
+    'PatternMatcher': 'classifier',
+    'ClassificationResult': 'classifier',
+    'AudioFileProcessor': 'processor',
+    'setup_logging': 'utils',
+    'load_config': 'utils',
+    'check_audio_libraries': 'utils',
+}
+
+__all__ = [*_EXPORTS, 'audio_analysis_available']
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(f'.{_EXPORTS[name]}', __name__), name)
+    elif name == 'audio_analysis_available':
+        # Check for required libraries
+        value = __getattr__('check_audio_libraries')()
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
@@ -94,8 +94,7 @@ class AudioAnalyzer:
             return
             
         try:
-            with open(self.patterns_file) as f:
-                patterns_data = json.load(f)
+            patterns_data = json.loads(Path(self.patterns_file).read_bytes())
                 
             # Check if duration thresholds are defined
             if 'duration_thresholds' in patterns_data:
@@ -172,9 +171,10 @@ class AudioAnalyzer:
         
         try:
             # Use a timeout to prevent hanging on corrupt files
-            with Timeout(seconds=self.analysis_timeout):
+            with Timeout(seconds=self.analysis_timeout) as timeout:
                 # Load audio file
                 y, sr = librosa.load(file_path, sr=None, mono=True, duration=30)
+                timeout.check()
                 
                 # Basic features
                 duration = librosa.get_duration(y=y, sr=sr)
@@ -188,9 +188,11 @@ class AudioAnalyzer:
                     # Tempo estimation can fail on non-rhythmic sounds
                     logging.debug(f"Tempo estimation failed for {file_path}: {e}")
                     tempo = 0.0
+                timeout.check()
                 
                 # Harmonic/percussive separation
                 y_harmonic, y_percussive = librosa.effects.hpss(y)
+                timeout.check()
                 harmonic_energy = np.mean(y_harmonic**2)
                 percussive_energy = np.mean(y_percussive**2)
                 total_energy = harmonic_energy + percussive_energy
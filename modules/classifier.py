@@ -3,10 +3,14 @@ Classification module for the Audio Sample Organizer
 Handles pattern matching and category detection
 """
 
+import concurrent.futures
 import json
 import logging
+import os
 import re
+import sys
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Set, Any
 
@@ -42,24 +46,45 @@ class ClassificationResult:
             
         return result
 
+@lru_cache(maxsize=1024)
+def _interned_path(*parts: str) -> str:
+    """Build and intern a subcategory path so repeated results share one string"""
+    return sys.intern("/".join(parts))
+
+# Pattern matcher installed in each worker process by classify_paths
+_worker_matcher = None
+
+def _init_worker(matcher: "PatternMatcher"):
+    """Install the pattern matcher once per worker process"""
+    global _worker_matcher
+    _worker_matcher = matcher
+
+def _classify_in_worker(args: Tuple[Path, Path]) -> "ClassificationResult":
+    """Classify a single path using the worker's pattern matcher"""
+    file_path, source_root = args
+    return _worker_matcher.classify_path(file_path, source_root)
+
 class PatternMatcher:
     """Handles pattern matching and compilation with improved categorization"""
     def __init__(self, patterns_file: Path):
         self.patterns_file = patterns_file
         
         # Load patterns
-        with open(patterns_file) as f:
-            pattern_data = json.load(f)
-            self.pattern_config = pattern_data["pattern_config"]
-            self.base_patterns = pattern_data["base_patterns"]
-            self.categories = pattern_data["categories"]
-            self.folder_structure = pattern_data.get("folder_structure", {})
+        pattern_data = json.loads(Path(patterns_file).read_bytes())
+        self.pattern_config = pattern_data["pattern_config"]
+        self.base_patterns = pattern_data["base_patterns"]
+        self.categories = pattern_data["categories"]
+        self.folder_structure = pattern_data.get("folder_structure", {})
         
         # Get classification priority from pattern file
         self.category_priority = pattern_data.get("classification_priority", {})
         
         # Pre-compile all patterns for better performance
         self.compiled_patterns = self._precompile_patterns()
+        self._bind_pattern_methods()
+        
+        # Folder context is shared by every file in a directory; cache it per matcher
+        self._folder_context = lru_cache(maxsize=8192)(self._folder_context_uncached)
         
         # Store exact match keywords for common categories to improve detection
         self.exact_keywords = self._build_exact_keywords()
@@ -67,6 +92,21 @@ class PatternMatcher:
         logging.info(f"Loaded patterns from {patterns_file}")
         logging.info(f"Compiled patterns for {len(self.categories)} categories")
     
+    def __getstate__(self) -> Dict[str, Any]:
+        """Drop compiled patterns when pickling for worker processes"""
+        state = self.__dict__.copy()
+        for key in ('compiled_patterns', '_loop_search', '_one_shot_search',
+                    '_category_finditers', '_subcategory_searches', '_folder_context'):
+            del state[key]
+        return state
+    
+    def __setstate__(self, state: Dict[str, Any]):
+        """Re-compile patterns after unpickling in a worker process"""
+        self.__dict__.update(state)
+        self.compiled_patterns = self._precompile_patterns()
+        self._bind_pattern_methods()
+        self._folder_context = lru_cache(maxsize=8192)(self._folder_context_uncached)
+    
     def _build_exact_keywords(self) -> Dict[str, Set[str]]:
         """Build lists of exact match keywords for each category to improve detection"""
         exact_keywords = {}
@@ -146,6 +186,109 @@ class PatternMatcher:
                     compiled['subcategories'][category][subcategory] = re.compile(f"{ci}{wb}(?:{pattern_str}){we}")
         
         return compiled
+    
+    def _bind_pattern_methods(self):
+        """Store bound search/finditer methods of the compiled patterns to skip per-call lookups"""
+        self._loop_search = self.compiled_patterns['base']["LOOP"].search
+        self._one_shot_search = self.compiled_patterns['base']["ONE SHOT"].search
+        self._category_finditers = {
+            category: [pattern.finditer for pattern in patterns]
+            for category, patterns in self.compiled_patterns['categories'].items()
+        }
+        self._subcategory_searches = {
+            category: {subcat: pattern.search for subcat, pattern in subpatterns.items()}
+            for category, subpatterns in self.compiled_patterns['subcategories'].items()
+        }
+    
+    def classify_path(self, file_path: Path, source_root: Path) -> ClassificationResult:
+        """Classify a file using filename and folder patterns only"""
+        # Split the path as a string rather than building parent/stem Path objects per file
+        parent, name = os.path.split(os.fspath(file_path))
+        base_name = os.path.splitext(name)[0].lower()
+        
+        # Folder names and scores are shared by every file in the directory
+        folder_names, folder_scores = self._folder_context(parent or os.curdir, os.fspath(source_root))
+        
+        # Collect all potential category matches with scores
+        category_scores = {}
+        
+        # 1. Check filename for category matches
+        for category, score in self.check_patterns(base_name, "filename").items():
+            category_scores[category] = category_scores.get(category, 0) + score
+        
+        # 2. Add folder name matches (already weighted)
+        for category, score in folder_scores.items():
+            category_scores[category] = category_scores.get(category, 0) + score
+        
+        # Determine best category, loop/one-shot and subcategory
+        best_category = self.get_best_category(category_scores, base_name, folder_names)
+        is_loop, is_one_shot = self.check_loop_or_oneshot(base_name, folder_names)
+        subcategory = self.determine_subcategory(
+            best_category, base_name, folder_names, is_loop, is_one_shot
+        )
+        
+        # If no category found, default to UNKNOWN
+        if not best_category or best_category == "UNKNOWN":
+            best_category = "UNKNOWN"
+            subcategory = "UNMATCHED_SAMPLES"
+        
+        # Calculate confidence
+        max_score = max(category_scores.values()) if category_scores else 0
+        confidence = min(1.0, max_score / 5.0)  # Normalize confidence
+        
+        # Collect all pattern matches for debugging
+        pattern_matches = [f"{category}: {score:.2f}" for category, score in category_scores.items()]
+        
+        return ClassificationResult(
+            original_path=file_path,
+            category=best_category,
+            subcategory=subcategory,
+            confidence=confidence,
+            matched_patterns=pattern_matches,
+            is_loop=is_loop,
+            is_one_shot=is_one_shot
+        )
+    
+    def _folder_context_uncached(self, parent: str, source_root: str) -> Tuple[Tuple[str, ...], Dict[str, float]]:
+        """Get the lowercased folder names of a directory and their weighted category scores"""
+        prefix = source_root.rstrip(os.sep) + os.sep
+        if parent == source_root:
+            rel_parent = ""
+        elif parent.startswith(prefix):
+            rel_parent = parent[len(prefix):]
+        else:
+            rel_parent = os.path.relpath(parent, source_root)
+            if rel_parent == os.curdir:
+                rel_parent = ""
+        folder_names = tuple(rel_parent.lower().split(os.sep)) if rel_parent else ()
+        
+        # Check folder names for category matches (higher weight)
+        folder_scores = {}
+        for folder in folder_names:
+            for category, score in self.check_patterns(folder, "folder").items():
+                folder_scores[category] = folder_scores.get(category, 0) + score * 1.5
+        
+        return folder_names, folder_scores
+    
+    def classify_paths(self, paths: List[Path], source_root: Path,
+                       workers: Optional[int] = None) -> List[ClassificationResult]:
+        """Classify many files in parallel across worker processes, preserving input order"""
+        paths = list(paths)
+        workers = workers or os.cpu_count() or 1
+        
+        # Not worth the process start-up cost for a single worker or tiny batches
+        if workers <= 1 or len(paths) < 2:
+            return [self.classify_path(path, source_root) for path in paths]
+        
+        chunksize = max(1, len(paths) // (workers * 8))
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(self,)
+        ) as executor:
+            return list(executor.map(
+                _classify_in_worker,
+                [(path, source_root) for path in paths],
+                chunksize=chunksize
+            ))
         
     def check_loop_or_oneshot(self, base_name: str, folder_names: List[str]) -> Tuple[bool, bool]:
         """Determine if the sample is a loop or one-shot using pre-compiled patterns"""
@@ -153,13 +296,13 @@ class PatternMatcher:
         is_one_shot = False
         
         # Check for loop patterns using pre-compiled regex
-        loop_pattern = self.compiled_patterns['base']["LOOP"]
-        if loop_pattern.search(base_name) or any(loop_pattern.search(folder) for folder in folder_names if folder):
+        loop_search = self._loop_search
+        if loop_search(base_name) or any(loop_search(folder) for folder in folder_names if folder):
             is_loop = True
         
         # Check for one-shot patterns using pre-compiled regex
-        one_shot_pattern = self.compiled_patterns['base']["ONE SHOT"]
-        if one_shot_pattern.search(base_name) or any(one_shot_pattern.search(folder) for folder in folder_names if folder):
+        one_shot_search = self._one_shot_search
+        if one_shot_search(base_name) or any(one_shot_search(folder) for folder in folder_names if folder):
             is_one_shot = True
         
         # If both are detected, do more specific checking
@@ -221,8 +364,8 @@ class PatternMatcher:
         match_strength = 0.0
         
         # Check each pattern for this category
-        for pattern in self.compiled_patterns['categories'][category]:
-            matches = list(pattern.finditer(text))
+        for finditer in self._category_finditers[category]:
+            matches = list(finditer(text))
             match_strength += len(matches) * 1.0
         
         return match_strength
@@ -263,9 +406,9 @@ class PatternMatcher:
         scores = {}
         
         # Check each category's patterns using pre-compiled regex
-        for category, patterns in self.compiled_patterns['categories'].items():
-            for pattern in patterns:
-                matches = list(pattern.finditer(text))
+        for category, finditers in self._category_finditers.items():
+            for finditer in finditers:
+                matches = list(finditer(text))
                 if matches:
                     if category not in scores:
                         scores[category] = 0
@@ -358,7 +501,7 @@ class PatternMatcher:
             # Default to UNKNOWN/UNMATCHED_SAMPLES
             return "UNKNOWN"
         
-        return best_category
+        return sys.intern(best_category)
         
      
     def determine_subcategory(self, category: str, base_name: str, folder_names: List[str], 
@@ -372,9 +515,9 @@ class PatternMatcher:
         
         # Look for direct matches in subPatterns
         direct_matches = []
-        if "subPatterns" in category_data and category in self.compiled_patterns['subcategories']:
-            for subcat, pattern in self.compiled_patterns['subcategories'][category].items():
-                if pattern.search(base_name) or any(pattern.search(folder) for folder in folder_names if folder):
+        if "subPatterns" in category_data and category in self._subcategory_searches:
+            for subcat, search in self._subcategory_searches[category].items():
+                if search(base_name) or any(search(folder) for folder in folder_names if folder):
                     direct_matches.append(subcat)
         
         # If we have direct matches, return the best one
@@ -413,11 +556,11 @@ class PatternMatcher:
                     # If it's a list (like ["LOOP", "ONE SHOT"])
                     if isinstance(subfolder, list):
                         if is_loop and "LOOP" in subfolder:
-                            return f"{folder_name}/LOOP"
+                            return _interned_path(folder_name, "LOOP")
                         elif is_one_shot and "ONE SHOT" in subfolder:
-                            return f"{folder_name}/ONE SHOT"
+                            return _interned_path(folder_name, "ONE SHOT")
                         elif subfolder:
-                            return f"{folder_name}/{subfolder[0]}"
+                            return _interned_path(folder_name, subfolder[0])
                         else:
                             return folder_name
                             
@@ -431,15 +574,15 @@ class PatternMatcher:
                                 # If it's a list (like ["LOOP", "ONE SHOT"])
                                 if isinstance(subsubfolder, list):
                                     if is_loop and "LOOP" in subsubfolder:
-                                        return f"{folder_name}/{subfolder_name}/LOOP"
+                                        return _interned_path(folder_name, subfolder_name, "LOOP")
                                     elif is_one_shot and "ONE SHOT" in subsubfolder:
-                                        return f"{folder_name}/{subfolder_name}/ONE SHOT"
+                                        return _interned_path(folder_name, subfolder_name, "ONE SHOT")
                                     elif subsubfolder:
-                                        return f"{folder_name}/{subfolder_name}/{subsubfolder[0]}"
+                                        return _interned_path(folder_name, subfolder_name, subsubfolder[0])
                                     else:
-                                        return f"{folder_name}/{subfolder_name}"
+                                        return _interned_path(folder_name, subfolder_name)
                                 else:
-                                    return f"{folder_name}/{subfolder_name}"
+                                    return _interned_path(folder_name, subfolder_name)
                         
                         # If no subfolder matches, use the first subfolder
                         subfolder_names = list(subfolder.keys())
@@ -449,15 +592,15 @@ class PatternMatcher:
                             
                             if isinstance(subsubfolder, list):
                                 if is_loop and "LOOP" in subsubfolder:
-                                    return f"{folder_name}/{first_subfolder}/LOOP"
+                                    return _interned_path(folder_name, first_subfolder, "LOOP")
                                 elif is_one_shot and "ONE SHOT" in subsubfolder:
-                                    return f"{folder_name}/{first_subfolder}/ONE SHOT"
+                                    return _interned_path(folder_name, first_subfolder, "ONE SHOT")
                                 elif subsubfolder:
-                                    return f"{folder_name}/{first_subfolder}/{subsubfolder[0]}"
+                                    return _interned_path(folder_name, first_subfolder, subsubfolder[0])
                                 else:
-                                    return f"{folder_name}/{first_subfolder}"
+                                    return _interned_path(folder_name, first_subfolder)
                             else:
-                                return f"{folder_name}/{first_subfolder}"
+                                return _interned_path(folder_name, first_subfolder)
                     else:
                         return folder_name
             
@@ -4,20 +4,23 @@ Handles file operations and organization
 """
 
 import concurrent.futures
+import errno
+import itertools
 import json
 import logging
 import os
+import queue
 import shutil
 import threading
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Any, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Any, Tuple
 
 # Import required modules
 from .analyzer import AudioAnalyzer, AudioFeatures
 from .classifier import PatternMatcher, ClassificationResult
-from .utils import ensure_dir, check_audio_libraries, sanitize_filename
+from .utils import ensure_dir, check_audio_libraries, copy_file, sanitize_filename, StatusMmap
 # Add this import at the top of processor.py
 from .classification_logger import ClassificationLogger
 
@@ -28,6 +31,7 @@ try:
     import matplotlib
     matplotlib.use('Agg')  # Use non-interactive backend
     import matplotlib.pyplot as plt
+    import numpy as np
     import seaborn as sns
     VISUALIZATION_AVAILABLE = True
 except ImportError:
@@ -42,6 +46,46 @@ except ImportError:
     PYDUB_AVAILABLE = False
     logging.warning("pydub not available - basic audio validation will be used")
 
+# Minimum seconds between progress status file writes
+_STATUS_WRITE_INTERVAL = 2.0
+
+# Progress bar width and its prebuilt filled/empty strings
+_BAR_LENGTH = 30
+_BAR_FILLED = '█' * _BAR_LENGTH
+_BAR_EMPTY = '░' * _BAR_LENGTH
+
+# Number of files each worker task works through
+_CHUNK_SIZE = 32
+
+# Temporary or metadata files that are never processed
+_INVALID_EXTENSIONS = frozenset({'.xmp', '.tmp', '.asd', '.ds_store', '.ini', ''})
+_INVALID_NAME_PATTERNS = ('abletontmp', 'tmp', 'temp')
+
+# Audio file signatures: (leading magic, form type, form type offset)
+_AUDIO_MAGICS = [
+    (b'RIFF', b'WAVE', 8),
+    (b'FORM', b'AIFF', 8),
+    (b'FORM', b'AIFC', 8),
+    (b'fLaC', None, 0),
+    (b'OggS', None, 0),
+    (b'ID3', None, 0),
+    (b'\xff\xfb', None, 0),
+    (b'\xff\xf3', None, 0),
+    (b'\xff\xf2', None, 0),
+]
+
+# Processor installed in each worker process by _process_files_multiprocess
+_worker_processor = None
+
+def _worker_init(processor: "AudioFileProcessor"):
+    """Install the pickled processor once per worker process"""
+    global _worker_processor
+    _worker_processor = processor
+
+def _worker_process_chunk(files: List[Path]) -> List[Tuple[Path, Optional[ClassificationResult], Optional[str]]]:
+    """Organize a run of files in a worker process, returning (path, result, error) for each"""
+    return _worker_processor._organize_chunk(files)
+
 class AudioFileProcessor:
     """Handles audio file processing and organization"""
     def __init__(self, config: Dict):
@@ -52,6 +96,9 @@ class AudioFileProcessor:
 
         # Create destination directory
         ensure_dir(self.dest_path)
+        
+        # Moves within one filesystem can be a single rename
+        self._same_device = self._on_same_device(self.source_path, self.dest_path)
     
         self.patterns_file = Path(config.get('patterns_file', './config/patterns.json'))
     
@@ -86,8 +133,25 @@ class AudioFileProcessor:
         self.non_audio_extensions = set(config.get('ignore_patterns', 
                                       ['.asd', '.ds_store', '.ini', '.txt', '.md']))
         
-        # Thread safety
-        self._stats_lock = threading.Lock()
+        # Destination directories already created during this run
+        self._ensured_dirs: Set[Path] = set()
+        
+        # Destination directory for each (category, subcategory) seen so far
+        self._dest_dir_cache: Dict[Tuple[str, str], Path] = {}
+        
+        # Names already used in each destination directory, for conflict-free naming
+        self._dest_names: Dict[Path, Set[str]] = {}
+        self._next_counter: Dict[Tuple[Path, str], int] = {}
+        self._dest_names_lock = threading.Lock()
+        
+        # Set once the source scan has found every file
+        self._scan_complete = False
+        
+        # Memory-mapped progress counters, opened on the first status update
+        self._status_mmap: Optional[StatusMmap] = None
+        
+        # Monotonic time of the last progress status file write
+        self._last_status_write = 0.0
         
         # Initialize statistics
         self.stats = {
@@ -108,42 +172,39 @@ class AudioFileProcessor:
 
     def _create_initial_folder_structure(self):
         """Create the initial folder structure from patterns file"""
-        with open(self.patterns_file) as f:
-            patterns = json.load(f)
+        patterns = json.loads(Path(self.patterns_file).read_bytes())
     
         # Get folder structure from patterns file
         folder_structure = patterns.get("folder_structure", {})
     
-        # Function to recursively build paths
-        def build_paths(structure, current_path=""):
-            paths = []
+        # Walk the structure iteratively, collecting every directory before its children
+        folder_paths = []
+        stack = [(folder_structure, "")]
+        while stack:
+            structure, current_path = stack.pop()
             if isinstance(structure, dict):
                 for key, value in structure.items():
                     new_path = f"{current_path}/{key}" if current_path else key
+                    folder_paths.append(new_path)
                     if value:  # If it has children
-                        paths.extend(build_paths(value, new_path))
-                    else:
-                        paths.append(new_path)
+                        stack.append((value, new_path))
             elif isinstance(structure, list):
-                if structure:  # If the list has items
-                    for item in structure:
-                        new_path = f"{current_path}/{item}" if current_path else item
-                        paths.append(new_path)
-                else:
-                    # If the list is empty, just add the current path
-                    paths.append(current_path)
-            return paths
-    
-        # Build all paths
-        folder_paths = build_paths(folder_structure)
+                for item in structure:
+                    folder_paths.append(f"{current_path}/{item}" if current_path else item)
     
         # Add reports directory
         folder_paths.append("reports")
     
-        # Create all directories
-        for folder_path in folder_paths:
+        # Create each directory once; parents always come first, so no parents=True stat chain
+        for folder_path in dict.fromkeys(folder_paths):
             full_path = self.dest_path / folder_path
-            full_path.mkdir(parents=True, exist_ok=True)
+            try:
+                os.mkdir(full_path)
+            except FileExistsError:
+                pass
+            except FileNotFoundError:
+                # Names containing '/' need their intermediate directories created too
+                full_path.mkdir(parents=True, exist_ok=True)
     
         logging.info(f"Created folder structure with {len(folder_paths)} directories")
 
@@ -152,22 +213,31 @@ class AudioFileProcessor:
         start_time = time.time()
         
         try:
-            # Get all files recursively
-            all_files = list(self._get_files())
-            valid_files = [f for f in all_files if self._is_valid_file(f)]
-            
-            self.stats['total_files'] = len(valid_files)
-            logging.info(f"Found {self.stats['total_files']} files to process")
-            
             # Process files in parallel if enabled
             max_workers = self.config.get('threads', os.cpu_count())
             
-            if max_workers > 1 and self.stats['total_files'] > 10:
-                logging.info(f"Using {max_workers} threads for parallel processing")
-                self._process_files_parallel(valid_files, max_workers)
+            # Scan the source tree in the background; files are processed as they are found
+            files = self._scan_in_background(max(1, max_workers) * 8)
+            
+            # Only go parallel when there is enough work, without waiting for the whole scan
+            head = list(itertools.islice(files, 11))
+            files = itertools.chain(head, files)
+            
+            if max_workers > 1 and len(head) > 10:
+                if self._use_process_pool():
+                    logging.info(f"Using {max_workers} processes for parallel processing")
+                    self._process_files_multiprocess(files, max_workers)
+                else:
+                    logging.info(f"Using {max_workers} threads for parallel processing")
+                    self._process_files_parallel(files, max_workers)
             else:
                 logging.info("Using single-threaded processing")
-                self._process_files_sequential(valid_files)
+                self._process_files_sequential(files)
+            
+            logging.info(f"Scanned {self.stats['total_files']} files")
+            
+            # Always write the final status, whatever the throttle last allowed
+            self._update_progress_status(final=True)
             
             # Generate report
             if self.config.get('generate_report', True):
@@ -202,52 +272,120 @@ class AudioFileProcessor:
                     
             logging.error(f"Error during file processing: {str(e)}", exc_info=True)
             raise
+        
+        finally:
+            # Release the progress counters mapping
+            if self._status_mmap is not None:
+                self._status_mmap.close()
+                self._status_mmap = None
     
-    def _get_files(self) -> List[Path]:
+    def _get_files(self) -> Iterator[os.DirEntry]:
         """Get all files from source directory, respecting config options"""
         if self.config.get('process_subfolders', True):
-            return list(self.source_path.rglob('*'))
+            return self._scandir_recursive(self.source_path)
         else:
-            return list(self.source_path.glob('*'))
+            return self._scandir_files(self.source_path)
+    
+    def _scandir_files(self, directory: Path) -> Iterator[os.DirEntry]:
+        """Yield file entries directly inside a directory"""
+        try:
+            with os.scandir(directory) as it:
+                files = [entry for entry in it if entry.is_file()]
+        except OSError as e:
+            logging.warning(f"Skipping unreadable directory {directory}: {str(e)}")
+            return
+        yield from files
+    
+    def _scandir_recursive(self, directory: Path) -> Iterator[os.DirEntry]:
+        """Yield file entries in a directory tree one directory at a time, without following symlinked directories"""
+        files = []
+        subdirs = []
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                    elif entry.is_file():
+                        files.append(entry)
+        except OSError as e:
+            # Like rglob, skip directories that cannot be read and carry on with the rest
+            logging.warning(f"Skipping unreadable directory {directory}: {str(e)}")
+            return
+        
+        # Keep each directory's files together so workers read neighbouring files
+        files.sort(key=lambda entry: entry.name)
+        yield from files
+        for subdir in sorted(subdirs):
+            yield from self._scandir_recursive(subdir)
     
-    def _is_valid_file(self, file_path: Path) -> bool:
+    def _iter_valid_files(self) -> Iterator[Path]:
+        """Yield valid files as the source tree is scanned, counting them in total_files"""
+        for entry in self._get_files():
+            if self._is_valid_file(entry):
+                self.stats['total_files'] += 1
+                yield Path(entry.path)
+        self._scan_complete = True
+    
+    def _scan_in_background(self, maxsize: int) -> Iterator[Path]:
+        """Scan the source tree on a background thread, yielding valid files through a bounded queue"""
+        found: queue.Queue = queue.Queue(maxsize=maxsize)
+        done = object()
+        
+        def scan():
+            try:
+                for file_path in self._iter_valid_files():
+                    found.put(file_path)
+            except Exception as e:
+                logging.error(f"Error scanning {self.source_path}: {str(e)}")
+                self.stats['error_logs'].append(str(e))
+                self._scan_complete = True
+            finally:
+                found.put(done)
+        
+        threading.Thread(target=scan, name="source-scanner", daemon=True).start()
+        while True:
+            file_path = found.get()
+            if file_path is done:
+                return
+            yield file_path
+    
+    def _is_valid_file(self, entry: os.DirEntry) -> bool:
         """Check if a file should be processed"""
-        # Skip directories
-        if not file_path.is_file():
-            return False
-            
+        name = entry.name
+        
         # Skip hidden files
-        if file_path.name.startswith('.'):
-            return False
-            
-        # Skip files in ignore patterns
-        if file_path.suffix.lower() in self.non_audio_extensions:
+        if name.startswith('.'):
             return False
         
-        # Skip temporary or metadata files
-        invalid_extensions = {'.xmp', '.tmp', '.asd', '.ds_store', '.ini', ''}
-        invalid_patterns = ['AbletonTmp', 'Tmp', 'temp']
-        
-        # Check extension
-        if file_path.suffix.lower() in invalid_extensions:
+        ext = os.path.splitext(name)[1].lower()
+            
+        # Skip files in ignore patterns and temporary or metadata files
+        if ext in self.non_audio_extensions or ext in _INVALID_EXTENSIONS:
             return False
         
         # Check filename for temporary file patterns
-        if any(pattern.lower() in file_path.name.lower() for pattern in invalid_patterns):
+        name_lower = name.lower()
+        if any(pattern in name_lower for pattern in _INVALID_NAME_PATTERNS):
             return False
                 
         # Check if it's a known audio extension
-        if file_path.suffix.lower() in self.audio_extensions:
+        if ext in self.audio_extensions:
             return True
                 
         # For unknown types, attempt more thorough check
-        return self._is_valid_audio(file_path)
+        return self._is_valid_audio(Path(entry.path))
         
     def _is_valid_audio(self, file_path: Path) -> bool:
         """Check if file is a valid audio file"""
         # Skip .asd files and other non-audio files
         if file_path.suffix.lower() in self.non_audio_extensions:
             return False
+        
+        # Recognize common audio containers from their header without decoding
+        if self._has_audio_magic(file_path):
+            # Cache this extension for future checks
+            self.audio_extensions.add(file_path.suffix.lower())
+            return True
             
         # For unknown formats, try pydub if available
         if PYDUB_AVAILABLE:
@@ -267,222 +405,278 @@ class AudioFileProcessor:
             # Without pydub, just check common extensions
             return file_path.suffix.lower() in ['.wav', '.mp3', '.aif', '.aiff', '.ogg', '.flac']
     
-    def _process_files_parallel(self, files: List[Path], max_workers: int):
-        """Process files in parallel using ThreadPoolExecutor"""
-        total_files = len(files)
-        last_progress_time = time.time()
+    def _has_audio_magic(self, file_path: Path) -> bool:
+        """Check the first bytes of a file against known audio format signatures"""
+        try:
+            with open(file_path, 'rb') as f:
+                head = f.read(16)
+        except OSError:
+            return False
+        
+        for magic, form_type, form_offset in _AUDIO_MAGICS:
+            if head.startswith(magic) and (
+                form_type is None or head[form_offset:form_offset + len(form_type)] == form_type
+            ):
+                return True
+        return False
+    
+    def _use_process_pool(self) -> bool:
+        """Decide whether parallel processing should use worker processes instead of threads"""
+        if self.config.get('parallel_backend', 'process') != 'process':
+            return False
+        
+        # The persistent analysis cache lives in this process, so keep workers in-process to share it
+        if self.audio_analyzer and self.audio_analyzer.using_persistent_cache:
+            logging.info("Persistent analysis cache enabled - using threads instead of processes")
+            return False
+        
+        return True
+    
+    def _show_progress(self, processed_count: int, total_files: int):
+        """Print the progress bar and write the progress status file
+        
+        Progress is a side channel, so errors here are logged and never count against a file.
+        """
+        try:
+            self._print_progress(processed_count, total_files)
+            self._update_progress_status()
+        except Exception as e:
+            logging.error(f"Error updating progress: {str(e)}")
+    
+    def _print_progress(self, processed_count: int, total_files: int):
+        """Print the progress bar to the console"""
+        elapsed = time.time() - self.stats['start_time']
+        files_per_second = processed_count / elapsed if elapsed > 0 else 0
+        
+        # The total is still growing while the scan runs, so show an indeterminate bar
+        if not self._scan_complete:
+            position = processed_count % _BAR_LENGTH
+            bar = _BAR_EMPTY[:position] + '█' + _BAR_EMPTY[position + 1:]
+            print(f"\rProgress: [{bar}] {processed_count}/{total_files} | "
+                  f"Speed: {files_per_second:.2f} files/sec | scanning...", end='', flush=True)
+            return
+        
+        percent_complete = (processed_count / total_files) * 100
+        
+        # Calculate estimated time remaining
+        if files_per_second > 0:
+            remaining_files = total_files - processed_count
+            eta_seconds = remaining_files / files_per_second
+            eta_str = self._format_time(eta_seconds)
+        else:
+            eta_str = "calculating..."
+        
+        # Create progress bar from the prebuilt halves
+        filled_length = int(_BAR_LENGTH * processed_count // total_files)
+        bar = _BAR_FILLED[:filled_length] + _BAR_EMPTY[filled_length:]
+        
+        # Clear line and print progress
+        print(f"\rProgress: [{bar}] {processed_count}/{total_files} ({percent_complete:.1f}%) | "
+              f"Speed: {files_per_second:.2f} files/sec | ETA: {eta_str}", end='', flush=True)
+        
+        # Also log to file but less frequently
+        if processed_count % 100 == 0 or processed_count == total_files:
+            logging.info(f"Processed {processed_count} of {total_files} files ({percent_complete:.1f}%)")
+    
+    def _collect_results(self, outcomes: Iterable[Tuple[Path, Optional[ClassificationResult], Optional[str]]]):
+        """Record worker outcomes with progress display; this thread is the single writer of the statistics"""
         progress_interval = 2  # Update progress every 2 seconds
+        next_progress_at = time.monotonic() + progress_interval
         
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = {executor.submit(self._process_single_file, file_path): file_path for file_path in files}
+        processed_count = 0
+        for file_path, result, error in outcomes:
+            if error:
+                self.stats['failed_files'] += 1
+                self.stats['error_logs'].append(error)
+                continue
+            if not result:
+                continue
             
-            # Process completed futures
-            processed_count = 0
-            for future in concurrent.futures.as_completed(futures):
-                file_path = futures[future]
-                try:
-                    result = future.result()
-                    if result:
-                        processed_count += 1
-                        
-                        # Show progress in real-time to the console
-                        current_time = time.time()
-                        if current_time - last_progress_time >= progress_interval or processed_count == total_files:
-                            elapsed = current_time - self.stats['start_time']
-                            files_per_second = processed_count / elapsed if elapsed > 0 else 0
-                            percent_complete = (processed_count / total_files) * 100
-                            
-                            # Calculate estimated time remaining
-                            if files_per_second > 0:
-                                remaining_files = total_files - processed_count
-                                eta_seconds = remaining_files / files_per_second
-                                eta_str = self._format_time(eta_seconds)
-                            else:
-                                eta_str = "calculating..."
-                            
-                            # Create progress bar
-                            bar_length = 30
-                            filled_length = int(bar_length * processed_count // total_files)
-                            bar = '█' * filled_length + '░' * (bar_length - filled_length)
-                            
-                            # Clear line and print progress
-                            print(f"\rProgress: [{bar}] {processed_count}/{total_files} ({percent_complete:.1f}%) | "
-                                  f"Speed: {files_per_second:.2f} files/sec | ETA: {eta_str}", end='', flush=True)
-                            
-                            last_progress_time = current_time
-                            
-                            # Also log to file but less frequently
-                            if processed_count % 100 == 0 or processed_count == total_files:
-                                logging.info(f"Processed {processed_count} of {total_files} files ({percent_complete:.1f}%)")
-                            # Update progress status file
-                            self._update_progress_status()
-                        
-                except Exception as e:
-                    logging.error(f"Error processing {file_path}: {str(e)}")
-                    with self._stats_lock:
-                        self.stats['failed_files'] += 1
-                        self.stats['error_logs'].append(str(e))
-            
-            # Final newline after progress bar
-            print()
-    
-    def _process_files_sequential(self, files: List[Path]):
+            self._record_result(result)
+            processed_count += 1
+            
+            # Show progress in real-time to the console
+            now = time.monotonic()
+            if now >= next_progress_at:
+                self._show_progress(processed_count, self.stats['total_files'])
+                next_progress_at = now + progress_interval
+        
+        # Final progress update, then a newline after the progress bar
+        if self.stats['total_files']:
+            self._show_progress(processed_count, self.stats['total_files'])
+        print()
+    
+    def _bounded_map(self, executor: concurrent.futures.Executor, fn, items: Iterable, max_in_flight: int) -> Iterator:
+        """Submit items lazily with at most max_in_flight tasks pending, yielding results as they complete"""
+        items = iter(items)
+        pending = {executor.submit(fn, item) for item in itertools.islice(items, max_in_flight)}
+        while pending:
+            done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+                # Top the window back up from the file stream
+                for item in itertools.islice(items, 1):
+                    pending.add(executor.submit(fn, item))
+    
+    def _chunked(self, files: Iterable[Path], size: int) -> Iterator[List[Path]]:
+        """Group a stream of files into lists of neighbouring files"""
+        files = iter(files)
+        while True:
+            chunk = list(itertools.islice(files, size))
+            if not chunk:
+                return
+            yield chunk
+    
+    def _process_files_multiprocess(self, files: Iterable[Path], max_workers: int):
+        """Process files in parallel using ProcessPoolExecutor with chunked, bounded submission"""
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=max_workers, initializer=_worker_init, initargs=(self,)
+        ) as executor:
+            # Each worker gets a run of neighbouring files from the directory-ordered scan
+            chunk_outcomes = self._bounded_map(
+                executor, _worker_process_chunk, self._chunked(files, _CHUNK_SIZE), max_workers * 4
+            )
+            self._collect_results(outcome for outcomes in chunk_outcomes for outcome in outcomes)
+    
+    def _process_files_parallel(self, files: Iterable[Path], max_workers: int):
+        """Process files in parallel using ThreadPoolExecutor with chunked, bounded submission"""
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # Each thread works through a run of neighbouring files from the directory-ordered scan
+            chunk_outcomes = self._bounded_map(
+                executor, self._organize_chunk, self._chunked(files, _CHUNK_SIZE), max_workers * 4
+            )
+            self._collect_results(outcome for outcomes in chunk_outcomes for outcome in outcomes)
+    
+    def _process_files_sequential(self, files: Iterable[Path]):
         """Process files sequentially with real-time progress display"""
-        total_files = len(files)
-        last_progress_time = time.time()
         progress_interval = 1  # Update progress every second
+        next_progress_at = time.monotonic() + progress_interval
         
-        for index, file_path in enumerate(files):
+        attempted = 0
+        for file_path in files:
+            attempted += 1
             try:
-                self._process_single_file(file_path)
-                
-                # Show progress in real-time
-                current_time = time.time()
-                if current_time - last_progress_time >= progress_interval or (index + 1) == total_files:
-                    elapsed = current_time - self.stats['start_time']
-                    files_per_second = (index + 1) / elapsed if elapsed > 0 else 0
-                    percent_complete = ((index + 1) / total_files) * 100
-                    
-                    # Calculate estimated time remaining
-                    if files_per_second > 0:
-                        remaining_files = total_files - (index + 1)
-                        eta_seconds = remaining_files / files_per_second
-                        eta_str = self._format_time(eta_seconds)
-                    else:
-                        eta_str = "calculating..."
-                    
-                    # Create progress bar
-                    bar_length = 30
-                    filled_length = int(bar_length * (index + 1) // total_files)
-                    bar = '█' * filled_length + '░' * (bar_length - filled_length)
-                    
-                    # Clear line and print progress
-                    print(f"\rProgress: [{bar}] {index + 1}/{total_files} ({percent_complete:.1f}%) | "
-                          f"Speed: {files_per_second:.2f} files/sec | ETA: {eta_str}", end='', flush=True)
-                    
-                    last_progress_time = current_time
-                    
-                    # Also log to file but less frequently
-                    if (index + 1) % 100 == 0 or (index + 1) == total_files:
-                        logging.info(f"Processed {index + 1} of {total_files} files ({percent_complete:.1f}%)")
-                    # Update progress status file
-                    self._update_progress_status()
+                # Only one thread touches the statistics here, so no locking is needed
+                result = self._organize_file(file_path)
+                if result:
+                    self._record_result(result)
             
             except Exception as e:
-                logging.error(f"Error processing {file_path}: {str(e)}")
+                logging.error(f"Comprehensive Error processing {file_path}: {e}", exc_info=True)
                 self.stats['failed_files'] += 1
-                self.stats['error_logs'].append(str(e))
+                self.stats['error_logs'].append(f"{file_path}: {str(e)}")
+            
+            # Show progress in real-time
+            now = time.monotonic()
+            if now >= next_progress_at:
+                self._show_progress(attempted, self.stats['total_files'])
+                next_progress_at = now + progress_interval
         
-        # Final newline after progress bar
+        # Final progress update, then a newline after the progress bar
+        if attempted:
+            self._show_progress(attempted, self.stats['total_files'])
         print()
     
-    def _process_single_file(self, file_path: Path) -> bool:
-        """Process a single file"""
+    def _try_organize_file(self, file_path: Path) -> Tuple[Path, Optional[ClassificationResult], Optional[str]]:
+        """Organize one file, returning (path, result, error) instead of raising"""
         try:
-            # Extensive logging for debugging
-            logging.debug(f"Attempting to process file: {file_path}")
+            return file_path, self._organize_file(file_path), None
+        except Exception as e:
+            logging.error(f"Comprehensive Error processing {file_path}: {e}", exc_info=True)
+            return file_path, None, f"{file_path}: {str(e)}"
+    
+    def _organize_chunk(self, files: List[Path]) -> List[Tuple[Path, Optional[ClassificationResult], Optional[str]]]:
+        """Organize a run of files in the calling thread"""
+        return [self._try_organize_file(file_path) for file_path in files]
+    
+    def _organize_file(self, file_path: Path) -> Optional[ClassificationResult]:
+        """Classify and copy/move a single file, returning the result or None if it was skipped"""
+        # Extensive logging for debugging
+        logging.debug(f"Attempting to process file: {file_path}")
 
-            # Validate file existence and readability
-            if not file_path.exists():
-                logging.warning(f"File does not exist: {file_path}")
-                return False
-            
-            try:
-                # Check file permissions and readability
-                file_path.stat()
-            except PermissionError:
-                logging.error(f"Permission denied for file: {file_path}")
-                return False
-            except OSError as e:
-                logging.error(f"OS error accessing file {file_path}: {e}")
-                return False
+        # Validate file existence and readability
+        if not file_path.exists():
+            logging.warning(f"File does not exist: {file_path}")
+            return None
+        
+        try:
+            # Check file permissions and readability
+            file_path.stat()
+        except PermissionError:
+            logging.error(f"Permission denied for file: {file_path}")
+            return None
+        except OSError as e:
+            logging.error(f"OS error accessing file {file_path}: {e}")
+            return None
 
-            # Classify file with timeout mechanism
-            try:
-                result = self._classify_file(file_path)
-            except Exception as classify_error:
-                logging.error(f"Classification failed for {file_path}: {classify_error}", exc_info=True)
-                return False
+        # Classify file with timeout mechanism
+        try:
+            result = self._classify_file(file_path)
+        except Exception as classify_error:
+            logging.error(f"Classification failed for {file_path}: {classify_error}", exc_info=True)
+            return None
 
-            # If classification fails silently
-            if result is None:
-                logging.warning(f"No classification result for file: {file_path}")
-                return False
+        # If classification fails silently
+        if result is None:
+            logging.warning(f"No classification result for file: {file_path}")
+            return None
 
-            # More detailed logging
-            if result:
-                logging.debug(f"Classified: {file_path} -> {result.category}/{result.subcategory}")
-            else:
-                logging.warning(f"Classification failed for: {file_path}")
-            
-            # Attempt to copy/move file
-            try:
-                self._copy_file(file_path, result)
-            except Exception as copy_error:
-                logging.error(f"Error copying/moving file {file_path}: {copy_error}", exc_info=True)
-                return False
-            
-            # Update statistics in a thread-safe way
-            with self._stats_lock:
-                self.stats['processed_files'] += 1
-                category_key = f"{result.category}/{result.subcategory}" if result.subcategory else result.category
-                self.stats['category_counts'][category_key] = self.stats['category_counts'].get(category_key, 0) + 1
-                self.stats['confidence_scores'].append(result.confidence)
-                self.stats['match_details'].append(result.to_dict())
-                # In the _process_single_file method, add this after updating statistics:
-                # Log the classification result
-                self.logger.log_result(result.to_dict())
-            return True
-            
-        except Exception as e:
-            logging.error(f"Comprehensive Error processing {file_path}: {e}", exc_info=True)
-            with self._stats_lock:
-                self.stats['failed_files'] += 1
-                self.stats['error_logs'].append(f"{file_path}: {str(e)}")
-            return False
+        logging.debug(f"Classified: {file_path} -> {result.category}/{result.subcategory}")
+        
+        # Attempt to copy/move file
+        try:
+            self._copy_file(file_path, result)
+        except Exception as copy_error:
+            logging.error(f"Error copying/moving file {file_path}: {copy_error}", exc_info=True)
+            return None
+        
+        return result
+    
+    def _record_result(self, result: ClassificationResult):
+        """Add a successful classification to the statistics and classification log"""
+        self.stats['processed_files'] += 1
+        category_key = f"{result.category}/{result.subcategory}" if result.subcategory else result.category
+        self.stats['category_counts'][category_key] = self.stats['category_counts'].get(category_key, 0) + 1
+        self.stats['confidence_scores'].append(result.confidence)
+        result_dict = result.to_dict()
+        self.stats['match_details'].append(result_dict)
+        # Log the classification result
+        self.logger.log_result(result_dict)
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        """Pickle only what worker processes need to classify and copy files"""
+        state = self.__dict__.copy()
+        for key in ('_dest_names_lock', '_status_mmap', 'logger', 'cache_manager', 'stats'):
+            state.pop(key, None)
+        return state
+    
+    def __setstate__(self, state: Dict[str, Any]):
+        """Restore a worker-side processor without logging or cache state"""
+        self.__dict__.update(state)
+        self._dest_names_lock = threading.Lock()
+        self._dest_dir_cache = {}
+        self._status_mmap = None
+        self.logger = None
+        self.cache_manager = None
+        self.stats = None
     
     def _classify_file(self, file_path: Path) -> ClassificationResult:
         """Classify file using improved pattern matching and audio analysis"""
-        # Extract base name and folder paths for matching
-        base_name = file_path.stem.lower()
-        folder_path = str(file_path.relative_to(self.source_path).parent).lower()
-        folder_names = [part.lower() for part in file_path.relative_to(self.source_path).parent.parts]
+        # Classify from filename and folder patterns
+        result = self.pattern_matcher.classify_path(file_path, self.source_path)
+        best_category = result.category
+        subcategory = result.subcategory
+        
+        # If naming conventions already decide loop vs one-shot, skip the expensive audio analysis
+        pattern_loop, pattern_oneshot = result.is_loop, result.is_one_shot
+        if pattern_loop != pattern_oneshot:
+            return result
         
         # Analyze audio if analyzer is available
         audio_features = None
         if self.audio_analyzer:
             audio_features = self.audio_analyzer.analyze_file(file_path)
         
-        # First determine the category based on patterns
-        # Collect all potential category matches with scores
-        category_scores = {}
-        
-        # 1. Check filename for category matches
-        filename_matches = self.pattern_matcher.check_patterns(base_name, "filename")
-        for category, score in filename_matches.items():
-            if category not in category_scores:
-                category_scores[category] = 0
-            category_scores[category] += score
-        
-        # 2. Check folder names for category matches (higher weight)
-        for folder in folder_names:
-            folder_matches = self.pattern_matcher.check_patterns(folder, "folder")
-            for category, score in folder_matches.items():
-                if category not in category_scores:
-                    category_scores[category] = 0
-                category_scores[category] += score * 1.5  # Higher weight for folder matches
-        
-        # Determine best category and subcategory based on scores
-        best_category = self.pattern_matcher.get_best_category(category_scores, base_name, folder_names)
-        
-        # Determine if this is a loop or one-shot using pattern matching
-        pattern_loop, pattern_oneshot = self.pattern_matcher.check_loop_or_oneshot(base_name, folder_names)
-        
-        # Determine subcategory
-        subcategory = self.pattern_matcher.determine_subcategory(
-            best_category, base_name, folder_names, pattern_loop, pattern_oneshot
-        )
-        
         # Now that we know the category and subcategory, use them for audio detection
         is_loop, is_one_shot = pattern_loop, pattern_oneshot
         
@@ -519,31 +713,11 @@ class AudioFileProcessor:
             elif audio_features and audio_features.duration > 2.0:
                 is_loop, is_one_shot = True, False
         
-        # If no category found, default to UNKNOWN
-        if not best_category or best_category == "UNKNOWN":
-            best_category = "UNKNOWN"
-            subcategory = "UNMATCHED_SAMPLES"
-        
-        # Calculate confidence
-        max_score = max(category_scores.values()) if category_scores else 0
-        confidence = min(1.0, max_score / 5.0)  # Normalize confidence
-        
-        # Collect all pattern matches for debugging
-        pattern_matches = []
-        for category, score in category_scores.items():
-            pattern_matches.append(f"{category}: {score:.2f}")
-        
-        # Create the result
-        return ClassificationResult(
-            original_path=file_path,
-            category=best_category,
-            subcategory=subcategory,
-            confidence=confidence,
-            matched_patterns=pattern_matches,
-            is_loop=is_loop,
-            is_one_shot=is_one_shot,
-            audio_features=audio_features
-        )
+        # Attach the audio-refined result
+        result.is_loop = is_loop
+        result.is_one_shot = is_one_shot
+        result.audio_features = audio_features
+        return result
     
     def _copy_file(self, source_path: Path, result: ClassificationResult):
         """Copy file to destination based on classification result"""
@@ -551,45 +725,94 @@ class AudioFileProcessor:
         dest_dir = self._get_destination_directory(result.category, result.subcategory)
         
         # Create destination directory if it doesn't exist
-        ensure_dir(dest_dir)
-        
-        # Destination file path
-        dest_file = dest_dir / source_path.name
-        
-        # Handle filename conflicts
-        if dest_file.exists() and not self.config.get('overwrite_existing', False):
-            base = dest_file.stem
-            suffix = dest_file.suffix
-            counter = 1
-            while dest_file.exists():
-                dest_file = dest_dir / f"{base}_{counter}{suffix}"
-                counter += 1
+        if dest_dir not in self._ensured_dirs:
+            ensure_dir(dest_dir)
+            self._ensured_dirs.add(dest_dir)
         
-        # Copy or move the file
-        if self.config.get('move_files', False):
-            shutil.move(source_path, dest_file)
-            logging.debug(f"Moved {source_path} to {dest_file}")
+        # Destination file path; without overwrite, reserve a free name to handle conflicts
+        reserved = not self.config.get('overwrite_existing', False)
+        if reserved:
+            dest_file = self._reserve_destination(dest_dir, source_path.name)
         else:
-            shutil.copy2(source_path, dest_file)
-            logging.debug(f"Copied {source_path} to {dest_file}")
+            dest_file = dest_dir / source_path.name
+        
+        # Copy or move the file
+        try:
+            if self.config.get('move_files', False):
+                self._move_file(source_path, dest_file)
+                logging.debug(f"Moved {source_path} to {dest_file}")
+            else:
+                copy_file(source_path, dest_file)
+                logging.debug(f"Copied {source_path} to {dest_file}")
+        except Exception:
+            # Don't leave an empty reserved file behind
+            if reserved:
+                try:
+                    dest_file.unlink()
+                except OSError:
+                    pass
+            raise
+    
+    def _reserve_destination(self, dest_dir: Path, filename: str) -> Path:
+        """Pick a free name for a file in dest_dir and reserve it by creating the file"""
+        base, suffix = os.path.splitext(filename)
+        with self._dest_names_lock:
+            # Snapshot the directory once, then track names handed out in memory
+            names = self._dest_names.get(dest_dir)
+            if names is None:
+                names = self._dest_names[dest_dir] = set(os.listdir(dest_dir))
+            
+            candidate = filename
+            counter = self._next_counter.get((dest_dir, filename), 1)
+            while True:
+                if candidate not in names:
+                    names.add(candidate)
+                    try:
+                        os.close(os.open(dest_dir / candidate, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                    except FileExistsError:
+                        # Taken by another worker process since the snapshot
+                        pass
+                    else:
+                        if candidate != filename:
+                            self._next_counter[(dest_dir, filename)] = counter
+                        return dest_dir / candidate
+                candidate = f"{base}_{counter}{suffix}"
+                counter += 1
+    
+    def _on_same_device(self, source: Path, dest: Path) -> bool:
+        """Check whether two paths live on the same filesystem"""
+        try:
+            return os.stat(source).st_dev == os.stat(dest).st_dev
+        except OSError:
+            return False
+    
+    def _move_file(self, source_path: Path, dest_file: Path):
+        """Move a file, renaming in place when source and destination share a filesystem"""
+        if self._same_device:
+            try:
+                os.replace(source_path, dest_file)
+                return
+            except OSError as e:
+                # A mount point inside the source tree can still put this file elsewhere
+                if e.errno != errno.EXDEV:
+                    raise
+        shutil.move(source_path, dest_file)
     
     def _get_destination_directory(self, category: str, subcategory: str) -> Path:
         """Determine destination directory based on category and subcategory"""
-        # Start with category directory
-        dest_dir = self.dest_path / category
+        key = (category, subcategory)
+        dest_dir = self._dest_dir_cache.get(key)
+        if dest_dir is not None:
+            return dest_dir
         
-        # If no subcategory, that's the destination
+        # If no subcategory, the category directory is the destination
         if not subcategory:
-            return dest_dir
-            
-        # Handle subcategory with path components
-        if '/' in subcategory:
-            subcat_parts = subcategory.split('/')
-            for part in subcat_parts:
-                dest_dir = dest_dir / part
+            dest_dir = self.dest_path / category
         else:
-            dest_dir = dest_dir / subcategory
+            # Handle subcategory with path components
+            dest_dir = self.dest_path.joinpath(category, *subcategory.split('/'))
         
+        self._dest_dir_cache[key] = dest_dir
         return dest_dir
     
     def _generate_report(self):
@@ -672,46 +895,49 @@ class AudioFileProcessor:
             return
             
         try:
-            # 1. Generate category distribution plot
-            plt.figure(figsize=(15, 8))
-            categories = list(self.stats['category_counts'].keys())
-            counts = list(self.stats['category_counts'].values())
+            # Aggregate category counts as arrays
+            category_counts = self.stats['category_counts']
+            categories = np.array(list(category_counts.keys()))
+            counts = np.fromiter(category_counts.values(), dtype=np.int64, count=len(category_counts))
+            main_cats = np.char.partition(categories, '/')[:, 0]
             
+            # One figure canvas is reused for all charts
+            fig = plt.figure(figsize=(15, 8))
+            
+            # 1. Generate category distribution plot
             # Sort by main category first, then by count
-            sorted_data = sorted(zip(categories, counts), key=lambda x: (x[0].split('/')[0], -x[1]))
-            categories, counts = zip(*sorted_data) if sorted_data else ([], [])
+            order = np.lexsort((-counts, main_cats))
+            sorted_categories = categories[order]
             
-            plt.bar(range(len(categories)), counts)
-            plt.xticks(range(len(categories)), categories, rotation=90, ha='right')
+            plt.bar(range(len(sorted_categories)), counts[order])
+            plt.xticks(range(len(sorted_categories)), sorted_categories, rotation=90, ha='right')
             plt.title('Audio Samples Distribution by Category')
             plt.xlabel('Category')
             plt.ylabel('Number of Files')
             plt.tight_layout()
             plt.savefig(report_dir / f'category_distribution_{timestamp}.png')
-            plt.close()
             
             # 2. Generate confidence distribution plot
             if self.stats['confidence_scores']:
-                plt.figure(figsize=(10, 6))
-                sns.histplot(self.stats['confidence_scores'], bins=20)
+                fig.clf()
+                fig.set_size_inches(10, 6)
+                sns.histplot(np.asarray(self.stats['confidence_scores']), bins=20)
                 plt.title('Pattern Matching Confidence Distribution')
                 plt.xlabel('Confidence Score')
                 plt.ylabel('Count')
                 plt.tight_layout()
                 plt.savefig(report_dir / f'confidence_distribution_{timestamp}.png')
-                plt.close()
             
             # 3. Generate category breakdown pie chart
-            plt.figure(figsize=(12, 12))
-            
-            # Group by main category
-            main_categories = {}
-            for cat, count in self.stats['category_counts'].items():
-                main_cat = cat.split('/')[0]
-                main_categories[main_cat] = main_categories.get(main_cat, 0) + count
+            fig.clf()
+            fig.set_size_inches(12, 12)
             
-            labels = list(main_categories.keys())
-            sizes = list(main_categories.values())
+            # Group by main category, keeping the order in which main categories first appear
+            labels, first_index, inverse = np.unique(main_cats, return_index=True, return_inverse=True)
+            sizes = np.bincount(inverse.ravel(), weights=counts)
+            appearance = np.argsort(first_index)
+            labels = labels[appearance]
+            sizes = sizes[appearance]
             
             # Use a colormap
             colors = plt.cm.tab10(range(len(labels)))
@@ -720,7 +946,7 @@ class AudioFileProcessor:
             plt.axis('equal')
             plt.title('Distribution by Main Category')
             plt.savefig(report_dir / f'category_pie_chart_{timestamp}.png')
-            plt.close()
+            plt.close(fig)
             
         except Exception as e:
             logging.error(f"Error generating visualizations: {str(e)}")
@@ -736,35 +962,64 @@ class AudioFileProcessor:
             hours = seconds / 3600
             return f"{hours:.1f} hours"
     
-    def _update_progress_status(self):
-        """Write current progress to a status file"""
+    def _update_progress_status(self, final: bool = False):
+        """Write current progress to a status file, at most once every couple of seconds
+        
+        The final update at the end of a run is always written and marks the run complete.
+        """
         status_file = self.dest_path / "progress_status.json"
 
+        # Snapshot the counters once; they are only written by the thread calling this
+        stats = self.stats
+        total = stats['total_files']
+        processed = stats['processed_files']
+        is_complete = final or (self._scan_complete and processed >= total)
+
         # Calculate elapsed time and speed
-        elapsed = time.time() - self.stats['start_time']
-        files_per_second = self.stats['processed_files'] / elapsed if elapsed > 0 else 0
+        elapsed = time.time() - stats['start_time']
+        files_per_second = processed / elapsed if elapsed > 0 else 0
 
         # Calculate estimated time remaining
-        if files_per_second > 0 and self.stats['processed_files'] < self.stats['total_files']:
-            remaining_files = self.stats['total_files'] - self.stats['processed_files']
+        if files_per_second > 0 and processed < total:
+            remaining_files = total - processed
             eta_seconds = remaining_files / files_per_second
         else:
             eta_seconds = 0
 
+        # The counters go to the memory-mapped block on every update; it costs no system calls
+        try:
+            if self._status_mmap is None:
+                self._status_mmap = StatusMmap(self.dest_path / "progress_status.bin", writable=True)
+            self._status_mmap.write(total, processed, stats['failed_files'],
+                                    files_per_second, elapsed, eta_seconds, is_complete)
+        except OSError as e:
+            logging.warning(f"Could not write progress counters: {str(e)}")
+
+        # Throttle the JSON side-channel, but never skip the final write
+        now = time.monotonic()
+        if not final and now - self._last_status_write < _STATUS_WRITE_INTERVAL:
+            return
+        self._last_status_write = now
+
         # Prepare status data
         status = {
             "timestamp": datetime.now().isoformat(),
-            "total_files": self.stats['total_files'],
-            "processed_files": self.stats['processed_files'],
-            "failed_files": self.stats['failed_files'],
+            "total_files": total,
+            "processed_files": processed,
+            "failed_files": stats['failed_files'],
             "elapsed_seconds": elapsed,
             "files_per_second": files_per_second,
             "eta_seconds": eta_seconds,
-            "category_counts": self.stats['category_counts'],
-            "is_complete": self.stats['processed_files'] >= self.stats['total_files'],
-            "recent_errors": self.stats['error_logs'][-5:] if self.stats['error_logs'] else []
+            "category_counts": stats['category_counts'],
+            "is_complete": is_complete,
+            "recent_errors": stats['error_logs'][-5:] if stats['error_logs'] else []
         }
 
-        # Write to file
-        with open(status_file, 'w') as f:
-            json.dump(status, f, indent=2)
\ No newline at end of file
+        # Write to a temporary file and swap it in so readers never see a partial file
+        # (on Windows the replace fails while a reader has the file open; the next write catches up)
+        tmp_file = status_file.with_suffix('.tmp')
+        try:
+            tmp_file.write_bytes(json.dumps(status, separators=(',', ':')).encode('utf-8'))
+            os.replace(tmp_file, status_file)
+        except OSError as e:
+            logging.warning(f"Could not write progress status file: {str(e)}")
@@ -2,32 +2,77 @@
 Utility functions for the Audio Sample Organizer
 """
 
+import copy
+import errno
 import json
 import logging
+import mmap
 import os
 import platform
+import shutil
 import signal
+import struct
 import threading
+import time
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Any, Optional
 
+# Try importing filesystem event library
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    FileSystemEventHandler = object
+    WATCHDOG_AVAILABLE = False
+
+# signal.SIGALRM is not available on Windows
+_IS_POSIX = platform.system() != 'Windows'
+
 class Timeout:
-    """Context manager for timeout operations"""
+    """Context manager for timeout operations
+    
+    In the main thread on POSIX the block is interrupted with SIGALRM. In other
+    threads (and on Windows) a timer only marks the timeout as expired, and the
+    block calls check() between steps to raise TimeoutError.
+    """
     def __init__(self, seconds=1, error_message='Timeout'):
         self.seconds = seconds
         self.error_message = error_message
+        self.expired = threading.Event()
+        self._timer = None
+        self._previous_handler = None
         
     def handle_timeout(self, signum, frame):
+        self.expired.set()
         raise TimeoutError(self.error_message)
         
+    def check(self):
+        """Raise TimeoutError if the timeout has expired"""
+        if self.expired.is_set():
+            raise TimeoutError(self.error_message)
+        
     def __enter__(self):
-        if platform.system() != 'Windows':  # signal.SIGALRM not available on Windows
-            signal.signal(signal.SIGALRM, self.handle_timeout)
-            signal.alarm(self.seconds)
+        if self.seconds > 0:
+            # Signal handlers can only be installed from the main thread
+            if _IS_POSIX and threading.current_thread() is threading.main_thread():
+                self._previous_handler = signal.signal(signal.SIGALRM, self.handle_timeout)
+                signal.setitimer(signal.ITIMER_REAL, self.seconds)
+            else:
+                self._timer = threading.Timer(self.seconds, self.expired.set)
+                self._timer.daemon = True
+                self._timer.start()
+        return self
         
     def __exit__(self, type, value, traceback):
-        if platform.system() != 'Windows':
-            signal.alarm(0)
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        elif self._previous_handler is not None:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, self._previous_handler)
+            self._previous_handler = None
 
 def setup_logging(log_level: int = logging.INFO, log_file: str = 'audio_organizer.log'):
     """Setup logging configuration"""
@@ -55,73 +100,179 @@ def load_config(config_path: Optional[Path] = None) -> Dict[str, Any]:
         'logging_level': 'INFO'
     }
     
-    # If config path provided, try to load it
-    if config_path and config_path.exists():
-        try:
-            with open(config_path) as f:
-                loaded_config = json.load(f)
-                # Merge with defaults
-                config = {**default_config, **loaded_config}
-                return config
-        except Exception as e:
-            logging.error(f"Error loading config: {str(e)}")
-            raise
-    
-    # Try to find config.json in config directory
-    default_path = Path('./config/config.json')
-    if default_path.exists():
-        try:
-            with open(default_path) as f:
-                loaded_config = json.load(f)
-                # Merge with defaults
-                config = {**default_config, **loaded_config}
-                return config
-        except Exception as e:
-            logging.error(f"Error loading config: {str(e)}")
-            raise
+    # Use the provided config path if it exists, otherwise config.json in the config directory
+    for path in (config_path, Path('./config/config.json')):
+        if path and path.exists():
+            try:
+                # Deep-copy the cached parse so callers can modify nested settings freely
+                loaded_config = copy.deepcopy(_read_json(str(path), path.stat().st_mtime_ns))
+            except Exception as e:
+                logging.error(f"Error loading config: {str(e)}")
+                raise
+            # Merge with defaults
+            return {**default_config, **loaded_config}
     
     logging.warning("No config file found, using defaults")
     return default_config
 
+# Shared decoder; config files are UTF-8, so skip json.loads' encoding detection
+_json_decode = json.JSONDecoder().decode
+
+@lru_cache(maxsize=8)
+def _read_json(path: str, mtime_ns: int) -> Dict[str, Any]:
+    """Parse a JSON file, cached until its modification time changes
+    
+    The returned object is shared between calls and must not be modified.
+    """
+    return _json_decode(Path(path).read_bytes().decode('utf-8'))
+
 def get_file_extension(file_path: Path) -> str:
     """Get file extension in lowercase without the dot"""
-    return file_path.suffix.lower()[1:] if file_path.suffix else ""
+    return _extension_lower(file_path.suffix)
+
+@lru_cache(maxsize=64)
+def _extension_lower(suffix: str) -> str:
+    """Lowercase a suffix without its dot; suffixes repeat, so results are cached"""
+    return suffix[1:].lower() if suffix else ""
 
 def ensure_dir(directory: Path):
     """Ensure a directory exists, creating it if necessary"""
     directory.mkdir(parents=True, exist_ok=True)
 
-class FileLock:
-    """Simple lock for file operations"""
-    def __init__(self):
-        self.lock = threading.Lock()
+# copy_file_range errors that mean "not supported here", not a failed copy
+_COPY_RANGE_UNSUPPORTED = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.EBADF}
+
+def _copy_file_range(source_fd: int, dest_fd: int) -> bool:
+    """Copy file data in the kernel with copy_file_range, returning False if unsupported"""
+    blocksize = min(max(os.fstat(source_fd).st_size, 2 ** 23), 2 ** 30)
+    offset = 0
+    while True:
+        try:
+            copied = os.copy_file_range(source_fd, dest_fd, blocksize)
+        except OSError as e:
+            if offset == 0 and e.errno in _COPY_RANGE_UNSUPPORTED:
+                return False
+            raise
+        if copied == 0:
+            # Some filesystems report 0 without copying anything; let the caller fall back
+            return offset > 0
+        offset += copied
+
+def copy_file(source: Path, dest: Path):
+    """Copy a file and its metadata like shutil.copy2, letting the kernel copy the data where possible"""
+    copied = False
+    if hasattr(os, 'copy_file_range'):
+        with open(source, 'rb') as fsrc, open(dest, 'wb') as fdst:
+            copied = _copy_file_range(fsrc.fileno(), fdst.fileno())
+    if not copied:
+        shutil.copyfile(source, dest)
+    shutil.copystat(source, dest)
+
+# Simple lock for file operations; threading.Lock already provides acquire/release
+# and the context manager protocol, so use it directly rather than wrapping it
+FileLock = threading.Lock
+
+class StatusMmap:
+    """Fixed-layout progress counters shared through a memory-mapped file
+    
+    The writer sets the leading sequence number odd while updating and even once
+    done, so readers retry instead of returning a half-written block.
+    """
+    SIZE = 512
+    FIELDS = ('total_files', 'processed_files', 'failed_files',
+              'files_per_second', 'elapsed_seconds', 'eta_seconds', 'is_complete', 'timestamp')
+    _LAYOUT = struct.Struct('<QQQQdddQd')  # sequence followed by FIELDS
+    _SEQUENCE = struct.Struct('<Q')
+    
+    def __init__(self, path: Path, writable: bool = False):
+        fd = os.open(path, os.O_RDWR | os.O_CREAT if writable else os.O_RDONLY, 0o644)
+        try:
+            if writable and os.fstat(fd).st_size < self.SIZE:
+                os.ftruncate(fd, self.SIZE)
+            self.mm = mmap.mmap(fd, self.SIZE, access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ)
+        finally:
+            os.close(fd)
+        self.sequence = 0
         
-    def acquire(self):
-        return self.lock.acquire()
+    def write(self, total_files, processed_files, failed_files,
+              files_per_second, elapsed_seconds, eta_seconds, is_complete):
+        self.sequence += 1
+        self._LAYOUT.pack_into(self.mm, 0, self.sequence, total_files, processed_files, failed_files,
+                               files_per_second, elapsed_seconds, eta_seconds, int(is_complete), time.time())
+        self.sequence += 1
+        self._SEQUENCE.pack_into(self.mm, 0, self.sequence)
         
-    def release(self):
-        return self.lock.release()
+    def read(self) -> Optional[Dict[str, Any]]:
+        """Return a consistent snapshot of the counters, or None if nothing has been written"""
+        for _ in range(100):
+            sequence, *values = self._LAYOUT.unpack_from(self.mm, 0)
+            if sequence and sequence % 2 == 0 and self._SEQUENCE.unpack_from(self.mm, 0)[0] == sequence:
+                status = dict(zip(self.FIELDS, values))
+                status['is_complete'] = bool(status['is_complete'])
+                return status
+        return None
         
-    def __enter__(self):
-        self.acquire()
-        return self
+    def close(self):
+        self.mm.close()
+
+class _ChangeHandler(FileSystemEventHandler):
+    """Set an event when anything (or one named file) changes"""
+    def __init__(self, changed: threading.Event, filename: Optional[str] = None):
+        super().__init__()
+        self.changed = changed
+        self.filename = filename
+        
+    def on_any_event(self, event):
+        if self.filename is None:
+            self.changed.set()
+            return
+        # Atomic replaces show up as moves onto the file
+        for path in (event.src_path, getattr(event, 'dest_path', '')):
+            if path and os.path.basename(os.fsdecode(path)) == self.filename:
+                self.changed.set()
+                return
+
+class ChangeWatcher:
+    """Wake a polling loop when a directory changes, falling back to plain timeouts without watchdog"""
+    def __init__(self, directory: Path, filename: Optional[str] = None, recursive: bool = False):
+        self.changed = threading.Event()
+        self.observer = None
+        if WATCHDOG_AVAILABLE and Path(directory).is_dir():
+            self.observer = Observer()
+            self.observer.schedule(_ChangeHandler(self.changed, filename), str(directory), recursive=recursive)
+            self.observer.daemon = True
+            self.observer.start()
         
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        self.release()
+    def wait(self, timeout: float) -> bool:
+        """Block until a change is seen or the timeout passes; returns whether a change was seen"""
+        changed = self.changed.wait(timeout)
+        self.changed.clear()
+        return changed
+        
+    def stop(self):
+        if self.observer:
+            self.observer.stop()
+            self.observer.join()
+            self.observer = None
+
+# Translation table mapping characters invalid in filenames to underscores
+_SANITIZE_TABLE = str.maketrans({char: '_' for char in '<>:"/\\|?*'})
 
 def sanitize_filename(filename: str) -> str:
     """Sanitize filename to be safe for all operating systems"""
-    # Replace invalid characters with underscores
-    invalid_chars = '<>:"/\\|?*'
-    for char in invalid_chars:
-        filename = filename.replace(char, '_')
+    # Replace invalid characters with underscores in a single pass
+    filename = filename.translate(_SANITIZE_TABLE)
     
-    # Truncate filenames to a reasonable length
-    if len(filename) > 255:
-        base, ext = os.path.splitext(filename)
-        filename = base[:255-len(ext)] + ext
-        
-    return filename
+    # Short names (nearly all of them) need no truncation
+    if len(filename) <= 255:
+        return filename
+    
+    # Truncate the base name, keeping the extension; leading dots are not an extension
+    base, dot, ext = filename.rpartition('.')
+    if not base.strip('.'):
+        return filename[:255]
+    ext = dot + ext
+    return base[:255-len(ext)] + ext
 
 def check_audio_libraries():
     """Check if audio analysis libraries are available"""
@@ -10,6 +10,35 @@ import time
 from datetime import datetime
 from pathlib import Path
 import re
+import sys
+
+from modules.utils import ChangeWatcher, StatusMmap
+
+# Use the faster orjson parser when available (its decode error subclasses json's),
+# otherwise one shared stdlib decoder fed decoded UTF-8 text
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    _decode = json.JSONDecoder().decode
+    json_loads = lambda data: _decode(data.decode('utf-8'))
+
+# ANSI sequence to move the cursor home and clear the screen
+CLEAR_SCREEN = "\x1b[H\x1b[2J"
+
+def enable_ansi_output():
+    """Turn on virtual terminal processing for the Windows console (no-op elsewhere)"""
+    if os.name != 'nt':
+        return
+    try:
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.GetStdHandle(-11)  # STD_OUTPUT_HANDLE
+        mode = ctypes.c_uint32()
+        if kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+            kernel32.SetConsoleMode(handle, mode.value | 0x0004)  # ENABLE_VIRTUAL_TERMINAL_PROCESSING
+    except Exception:
+        pass
 
 def format_time(seconds):
     """Format seconds into a readable time string"""
@@ -22,91 +51,115 @@ def format_time(seconds):
         hours = seconds / 3600
         return f"{hours:.1f} hours"
 
-def load_folder_structure():
-    """Load folder structure from patterns.json to organize output"""
+def load_folder_structure(config=None, config_path="config/config.json"):
+    """Load folder structure to organize output
+    
+    Uses the patterns summary embedded in config.json when present, unless the
+    patterns file has been modified since config.json was written; otherwise
+    the full patterns file is parsed.
+    """
+    config = config or {}
+    patterns_path = Path(config.get("patterns_file", "config/patterns.json"))
+    
+    summary = config.get("patterns_summary")
+    if summary and "folder_structure" in summary:
+        try:
+            stale = os.stat(patterns_path).st_mtime_ns > os.stat(config_path).st_mtime_ns
+        except OSError:
+            stale = False
+        if not stale:
+            return summary["folder_structure"]
+    
     try:
-        patterns_path = Path("config/patterns.json")
         if patterns_path.exists():
-            with open(patterns_path, 'r') as f:
-                patterns = json.load(f)
-                return patterns.get("folder_structure", {})
+            patterns = json_loads(patterns_path.read_bytes())
+            return patterns.get("folder_structure", {})
         return {}
     except Exception as e:
         print(f"Error loading folder structure: {e}")
         return {}
 
-def organize_categories(category_counts, folder_structure):
-    """Organize category counts according to folder structure"""
+def build_category_index(folder_structure):
+    """Index folder_structure paths in display order for organize_categories
+    
+    Returns (trie, unknown_rank, main_categories), or None without a folder
+    structure. The trie is keyed by character; a node's None entry holds the
+    [prefix rank, exact rank] of the structure path ending there.
+    """
     if not folder_structure:
-        # Just return sorted by count if no structure is available
-        return sorted(category_counts.items(), key=lambda x: x[1], reverse=True)
+        return None
+    
+    trie = {}
+    unknown_rank = None
+    rank = 0
     
-    # Create a mapping of category paths to their counts
-    organized = []
+    def add(path, kind):
+        nonlocal rank
+        node = trie
+        for char in path:
+            node = node.setdefault(char, {})
+        ranks = node.setdefault(None, [None, None])
+        if ranks[kind] is None:
+            ranks[kind] = rank
+        rank += 1
     
-    # Function to recursively process the folder structure
-    def process_structure(structure, current_path=""):
-        items = []
+    def walk(structure, current_path):
+        nonlocal unknown_rank
         if isinstance(structure, dict):
-            # Process each subcategory
             for key, value in structure.items():
-                new_path = f"{current_path}/{key}" if current_path else key
-                # Add items for this subcategory
-                items.extend(process_structure(value, new_path))
+                walk(value, f"{current_path}/{key}" if current_path else key)
         elif isinstance(structure, list):
-            # Process leaf nodes
+            # Leaf folders match every category that starts with their path
             for item in structure:
                 new_path = f"{current_path}/{item}" if current_path else item
-                # Check if this path or any subpath exists in category_counts
-                for cat, count in category_counts.items():
-                    if cat.startswith(new_path) or (new_path.startswith("UNKNOWN") and "UNKNOWN" in cat):
-                        items.append((cat, count))
-        
-        # Check if the current path itself exists in category_counts
-        for cat, count in category_counts.items():
-            if cat == current_path or (not current_path and cat.split('/')[0] == current_path):
-                items.append((cat, count))
-        
-        return items
-    
-    # Start with the root structure
+                if unknown_rank is None and new_path.startswith("UNKNOWN"):
+                    unknown_rank = rank
+                add(new_path, 0)
+        # The folder itself only matches its exact category
+        add(current_path, 1)
+    
     for category, struct in folder_structure.items():
-        organized.extend(process_structure(struct, category))
+        walk(struct, category)
     
-    # Add any remaining categories that weren't in the structure
-    for cat, count in category_counts.items():
-        if not any(cat == existing[0] for existing in organized):
-            organized.append((cat, count))
+    return trie, unknown_rank, list(folder_structure.keys())
+
+def organize_categories(category_counts, category_index):
+    """Organize category counts according to the indexed folder structure"""
+    if not category_index:
+        # Just return sorted by count if no structure is available
+        return sorted(category_counts.items(), key=lambda x: x[1], reverse=True)
+    
+    trie, unknown_rank, main_categories = category_index
+    no_match = float('inf')
+    
+    # Rank each category by the first structure path it falls under
+    ranked = []
+    for position, (cat, count) in enumerate(category_counts.items()):
+        best = unknown_rank if unknown_rank is not None and "UNKNOWN" in cat else no_match
+        node = trie
+        for char in cat:
+            node = node.get(char)
+            if node is None:
+                break
+            ranks = node.get(None)
+            if ranks and ranks[0] is not None and ranks[0] < best:
+                best = ranks[0]
+        else:
+            ranks = node.get(None)
+            if ranks and ranks[1] is not None and ranks[1] < best:
+                best = ranks[1]
+        ranked.append((best, position, cat, count))
+    ranked.sort()
     
-    # Ensure we didn't lose any categories
-    if len(organized) < len(category_counts):
-        # Add any missing categories
-        for cat, count in category_counts.items():
-            if not any(cat == existing[0] for existing in organized):
-                organized.append((cat, count))
+    # Group by main category, in folder structure order first
+    groups = {main_cat: [] for main_cat in main_categories}
+    for _, _, cat, count in ranked:
+        groups.setdefault(cat.partition('/')[0], []).append((cat, count))
     
-    # Sort within each main category by count
+    # Sort subcategories by count within each main category
     result = []
-    main_categories = {}
-    
-    for cat, count in organized:
-        main_cat = cat.split('/')[0]
-        if main_cat not in main_categories:
-            main_categories[main_cat] = []
-        main_categories[main_cat].append((cat, count))
-    
-    # Process categories in the order defined in the folder structure
-    ordered_categories = list(folder_structure.keys())
-    # Add any missing categories to the end
-    for cat in main_categories.keys():
-        if cat not in ordered_categories:
-            ordered_categories.append(cat)
-    
-    for main_cat in ordered_categories:
-        if main_cat in main_categories:
-            # Sort subcategories by count
-            sorted_subcats = sorted(main_categories[main_cat], key=lambda x: x[1], reverse=True)
-            result.extend(sorted_subcats)
+    for subcats in groups.values():
+        result.extend(sorted(subcats, key=lambda x: x[1], reverse=True))
     
     return result
 
@@ -117,50 +170,71 @@ def main():
     status_file = Path(output_dir) / "progress_status.json"
     
     # Try to load config for custom output path
+    config = {}
     config_path = Path("config/config.json")
     if config_path.exists():
         try:
-            with open(config_path, 'r') as f:
-                config = json.load(f)
-                output_dir = config.get("output_path", output_dir)
-                status_file = Path(output_dir) / "progress_status.json"
+            config = json_loads(config_path.read_bytes())
+            output_dir = config.get("output_path", output_dir)
+            status_file = Path(output_dir) / "progress_status.json"
         except Exception as e:
             print(f"Error loading config: {e}")
     
-    # Load folder structure from patterns.json
-    folder_structure = load_folder_structure()
+    # Load folder structure and index it once for every refresh
+    folder_structure = load_folder_structure(config, config_path)
+    category_index = build_category_index(folder_structure)
     
     print(f"Monitoring organization progress from: {status_file}")
     print("Waiting for process to start...")
     
-    # Clear screen function
-    clear = lambda: os.system('cls' if os.name=='nt' else 'clear')
+    # Let the Windows console interpret the ANSI clear-screen sequence
+    enable_ansi_output()
     
     # Wait for status file to appear
     while not status_file.exists():
         time.sleep(1)
     
+    # Wake up when the status file is rewritten instead of polling blindly
+    watcher = ChangeWatcher(status_file.parent, filename=status_file.name)
+    
+    # Frequently changing counters come from a memory-mapped block next to the status file
+    counters_file = status_file.with_suffix('.bin')
+    counters = None
+    status_mtime = None
+    
     try:
         while True:
-            if not status_file.exists():
+            # The processor replaces the status file atomically, so one read is a full snapshot;
+            # it only needs re-reading when it has been replaced
+            try:
+                mtime_ns = os.stat(status_file).st_mtime_ns
+                if mtime_ns != status_mtime:
+                    status = json_loads(status_file.read_bytes())
+                    status_mtime = mtime_ns
+            except FileNotFoundError:
                 print("Status file not found. Process may have ended.")
                 break
-            
-            try:
-                with open(status_file, 'r') as f:
-                    status = json.load(f)
             except json.JSONDecodeError:
-                # File might be in the middle of being written
-                time.sleep(0.5)
+                # Only a producer writing in place can leave partial JSON; wait for the next write
+                watcher.wait(0.5)
                 continue
             
-            # Clear screen and display progress
-            clear()
-            timestamp = datetime.fromisoformat(status["timestamp"])
+            if counters is None and counters_file.exists():
+                counters = StatusMmap(counters_file)
+            snapshot = counters.read() if counters else None
+            if snapshot:
+                # Stamped by the producer on every write, so a stalled run shows its last update
+                timestamp = datetime.fromtimestamp(snapshot.pop("timestamp"))
+                status.update(snapshot)
+            else:
+                timestamp = datetime.fromisoformat(status["timestamp"])
             
-            print(f"=== AUDIO SAMPLE ORGANIZER - REAL-TIME PROGRESS ===")
-            print(f"Status as of: {timestamp.strftime('%H:%M:%S')}")
-            print(f"Output directory: {output_dir}")
+            # Build the whole frame, then clear the screen and draw it in one write
+            out = [
+                CLEAR_SCREEN + "=== AUDIO SAMPLE ORGANIZER - REAL-TIME PROGRESS ===",
+                f"Status as of: {timestamp.strftime('%H:%M:%S')}",
+                f"Output directory: {output_dir}",
+            ]
             
             total = status["total_files"]
             processed = status["processed_files"]
@@ -172,38 +246,47 @@ def main():
             filled_length = int(bar_length * processed // total) if total > 0 else 0
             bar = '█' * filled_length + '░' * (bar_length - filled_length)
             
-            print(f"\nProgress: [{bar}] {processed:,}/{total:,} ({progress:.1f}%)")
-            print(f"Failed files: {failed}")
-            print(f"Processing speed: {status['files_per_second']:.2f} files/second")
-            print(f"Elapsed time: {format_time(status['elapsed_seconds'])}")
+            out.append(f"\nProgress: [{bar}] {processed:,}/{total:,} ({progress:.1f}%)")
+            out.append(f"Failed files: {failed}")
+            out.append(f"Processing speed: {status['files_per_second']:.2f} files/second")
+            out.append(f"Elapsed time: {format_time(status['elapsed_seconds'])}")
             
             if status['eta_seconds'] > 0:
-                print(f"Estimated time remaining: {format_time(status['eta_seconds'])}")
+                out.append(f"Estimated time remaining: {format_time(status['eta_seconds'])}")
             
             # Show category breakdown with improved organization
             if "category_counts" in status and status["category_counts"]:
-                print("\nCategory breakdown:")
-                organized_categories = organize_categories(status["category_counts"], folder_structure)
+                out.append("\nCategory breakdown:")
+                organized_categories = organize_categories(status["category_counts"], category_index)
                 
                 for category, count in organized_categories:
                     percent = (count / processed) * 100 if processed > 0 else 0
-                    print(f"  {category}: {count:,} files ({percent:.1f}%)")
+                    out.append(f"  {category}: {count:,} files ({percent:.1f}%)")
             
             # Show recent errors
             if "recent_errors" in status and status["recent_errors"]:
-                print("\nRecent errors:")
+                out.append("\nRecent errors:")
                 for error in status["recent_errors"]:
-                    print(f"  {error}")
+                    out.append(f"  {error}")
             
             # Check if process is complete
-            if status.get("is_complete", False):
-                print("\nProcess is complete!")
+            is_complete = status.get("is_complete", False)
+            if is_complete:
+                out.append("\nProcess is complete!")
+            
+            sys.stdout.write("\n".join(out) + "\n")
+            sys.stdout.flush()
+            if is_complete:
                 break
             
-            time.sleep(2)  # Update every 2 seconds
+            watcher.wait(2)  # Update on change, or at least every 2 seconds
     
     except KeyboardInterrupt:
         print("\nMonitoring stopped by user")
+    finally:
+        watcher.stop()
+        if counters:
+            counters.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
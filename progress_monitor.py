@@ -1,12 +1,71 @@
 import os
-from pathlib import Path
 import time
 
+from modules.utils import ChangeWatcher
+
 def count_files(directory):
     """Count files in a directory and its subdirectories"""
     count = 0
-    for root, dirs, files in os.walk(directory):
-        count += len(files)
+    stack = [os.fspath(directory)]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir():
+                        # Don't descend into symlinked directories (matches os.walk)
+                        if not entry.is_symlink():
+                            stack.append(entry.path)
+                    else:
+                        count += 1
+        except OSError:
+            continue
+    return count
+
+# Filesystems with coarse timestamps (FAT/exFAT, some network shares) can leave a
+# directory's mtime unchanged when a file lands within this long of the last scan
+MTIME_GRANULARITY_NS = 2_000_000_000
+
+def count_files_cached(directory, cache):
+    """Count files like count_files, only rescanning directories whose mtime changed
+    
+    cache maps each directory path to (st_mtime_ns, file count, subdirectories,
+    scan time in ns) and is updated in place for the next call. A directory
+    modified within MTIME_GRANULARITY_NS of its last scan is always rescanned.
+    """
+    count = 0
+    seen = {}
+    stack = [os.fspath(directory)]
+    while stack:
+        path = stack.pop()
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            continue
+        
+        cached = cache.get(path)
+        if cached is None or cached[0] != mtime_ns or mtime_ns >= cached[3] - MTIME_GRANULARITY_NS:
+            scanned_ns = time.time_ns()
+            files = 0
+            subdirs = []
+            try:
+                with os.scandir(path) as it:
+                    for entry in it:
+                        if entry.is_dir():
+                            if not entry.is_symlink():
+                                subdirs.append(entry.path)
+                        else:
+                            files += 1
+            except OSError:
+                continue
+            cached = (mtime_ns, files, subdirs, scanned_ns)
+        
+        seen[path] = cached
+        count += cached[1]
+        stack.extend(cached[2])
+    
+    # Forget directories that no longer exist
+    cache.clear()
+    cache.update(seen)
     return count
 
 def main():
@@ -18,9 +77,11 @@ def main():
     source_count = count_files(source_dir)
     print(f"Total source files: {source_count}")
     
-    # Monitor loop
+    # Monitor loop; only changed destination directories are rescanned each tick
+    dest_cache = {}
+    watcher = None
     while True:
-        dest_count = count_files(dest_dir)
+        dest_count = count_files_cached(dest_dir, dest_cache)
         if dest_count > 0:
             progress = (dest_count / source_count) * 100
             print(f"Progress: {dest_count} of {source_count} files processed ({progress:.1f}%)")
@@ -31,8 +92,20 @@ def main():
         if dest_count >= source_count:
             print("Process appears to be complete!")
             break
-            
-        time.sleep(5)  # Check every 5 seconds
+        
+        # Watch the destination for changes once it exists
+        if watcher is None and os.path.isdir(dest_dir):
+            watcher = ChangeWatcher(dest_dir, recursive=True)
+        
+        # Report at most once a second, waking on the next change or after 5 seconds
+        time.sleep(1)
+        if watcher:
+            watcher.wait(4)
+        else:
+            time.sleep(4)
+    
+    if watcher:
+        watcher.stop()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -17,14 +17,53 @@ Options:
 """
 
 import argparse
+import atexit
+import hashlib
+import importlib.util
 import json
 import logging
+import logging.handlers
 import os
 import re
 import shutil
+import stat
 import sys
 from pathlib import Path
 
+# Use the faster orjson parser when available
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _parse_json(data):
+    """Parse JSON bytes, preferring orjson"""
+    return orjson.loads(data) if orjson else json.loads(data)
+
+def _json_bytes(obj):
+    """Serialize obj as 4-space indented JSON, the layout setup has always written
+    
+    orjson can only indent by 2 spaces, so it is used for parsing but not here.
+    """
+    return json.dumps(obj, indent=4).encode('utf-8')
+
+def _write_atomic(path, data):
+    """Write data in one go to a temporary file, then swap it in atomically"""
+    path = Path(path)
+    tmp_path = path.with_name(path.name + '.tmp')
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+    os.replace(tmp_path, path)
+
+def _dump_json(obj, path):
+    """Atomically write obj as JSON"""
+    _write_atomic(path, _json_bytes(obj))
+
 # Global variable for interactive mode
 interactive_mode = False
 
@@ -49,13 +88,21 @@ def setup_project():
     
     # Configure logging
     log_level = logging.DEBUG if args.verbose else logging.INFO
+    log_format = '%(asctime)s - %(levelname)s - %(message)s'
+    
+    # The log file is written in batches; errors and exit flush it immediately
+    log_file = logging.FileHandler('audio_organizer_setup.log')
+    log_file.setFormatter(logging.Formatter(log_format))
+    file_handler = logging.handlers.MemoryHandler(capacity=64, flushLevel=logging.ERROR, target=log_file)
+    atexit.register(file_handler.flush)
     logging.basicConfig(
         level=log_level,
-        format='%(asctime)s - %(levelname)s - %(message)s',
+        format=log_format,
         handlers=[
-            logging.FileHandler('audio_organizer_setup.log'),
+            file_handler,
             logging.StreamHandler()
-        ]
+        ],
+        force=True
     )
     
     # Get current directory
@@ -71,7 +118,7 @@ def setup_project():
         # Ask user for source
         source_path = get_source_path_interactive()
     
-    if not source_path.exists():
+    if _path_kind(source_path) is None:
         logging.error(f"Source path does not exist: {source_path}")
         print(f"Error: Source path does not exist: {source_path}")
         sys.exit(1)
@@ -88,7 +135,7 @@ def setup_project():
         output_dir = current_dir / "organized_samples"
     
     # Clean output directory if requested
-    if args.clean and output_dir.exists():
+    if args.clean and _path_kind(output_dir) == 'dir':
         logging.warning(f"Cleaning output directory: {output_dir}")
         shutil.rmtree(output_dir)
     
@@ -97,23 +144,29 @@ def setup_project():
     config_dir.mkdir(exist_ok=True)
     output_dir.mkdir(parents=True, exist_ok=True)
     
-    # Create modules directory if it doesn't exist
+    # Create modules directory if it doesn't exist; trying mkdir directly doubles as the check
     modules_dir = current_dir / "modules"
-    if not modules_dir.exists():
-        modules_dir.mkdir()
+    try:
+        os.mkdir(modules_dir)
+    except FileExistsError:
+        pass
+    else:
         # Create empty __init__.py to make it a package
-        with open(modules_dir / "__init__.py", "w") as f:
-            f.write("# Audio Organizer modules package\n")
+        fd = os.open(modules_dir / "__init__.py", os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0), 0o644)
+        try:
+            os.write(fd, b"# Audio Organizer modules package\n")
+        finally:
+            os.close(fd)
     
     # Handle patterns file
     patterns_file = config_dir / "patterns.json"
     
     # If patterns file doesn't exist, create from template
-    if not patterns_file.exists():
+    if _path_kind(patterns_file) is None:
         # Check if we have a patterns.json in the current directory
         local_patterns = current_dir / "patterns.json"
-        if local_patterns.exists():
-            shutil.copy(local_patterns, patterns_file)
+        if _path_kind(local_patterns) == 'file':
+            shutil.copyfile(local_patterns, patterns_file)
             logging.info(f"Copied patterns from {local_patterns} to {patterns_file}")
         else:
             # Create a default patterns file or find one interactively
@@ -122,11 +175,11 @@ def setup_project():
             else:
                 create_default_patterns_file(patterns_file)
     
-    # Validate patterns file
-    validate_patterns_file(patterns_file)
+    # Validate patterns file, keeping the parsed patterns for the steps below
+    patterns = validate_patterns_file(patterns_file)
     
     # Create category directories from patterns
-    create_category_directories(patterns_file, output_dir)
+    create_category_directories(patterns, output_dir)
     
     # Get audio analysis preferences
     enable_audio_analysis = False
@@ -134,16 +187,24 @@ def setup_project():
         enable_audio_analysis = get_audio_analysis_preference()
     
     # Create config file for the organizer
-    create_config_file(config_dir, source_path, output_dir, patterns_file, 
-                      args.threads, enable_audio_analysis)
+    config_file = create_config_file(config_dir, source_path, output_dir, patterns_file, 
+                      args.threads, enable_audio_analysis, patterns)
     
     print("\n=== Setup complete! ===")
     print(f"Source directory: {source_path}")
     print(f"Output directory: {output_dir}")
     print(f"Patterns file: {patterns_file}")
-    print(f"Config file: {config_dir / 'config.json'}")
+    print(f"Config file: {config_file}")
     print("\nRun the organizer with: python audio_organizer.py")
 
+def _path_kind(path):
+    """Return 'dir', 'file' or None (missing) for a path, using a single stat call"""
+    try:
+        mode = os.stat(path).st_mode
+    except (OSError, ValueError):
+        return None
+    return 'dir' if stat.S_ISDIR(mode) else 'file'
+
 def print_welcome_message():
     """Print welcome message for interactive setup"""
     print("\n" + "="*60)
@@ -162,9 +223,13 @@ def get_source_path_interactive():
     while True:
         path_str = input("\nSource directory: ")
         path = Path(path_str)
-        if path.exists():
+        kind = _path_kind(path)
+        if kind == 'dir':
             return path
-        print(f"Error: Path '{path}' does not exist. Please enter a valid path.")
+        if kind:
+            print(f"Error: Path '{path}' is not a directory. Please enter a valid path.")
+        else:
+            print(f"Error: Path '{path}' does not exist. Please enter a valid path.")
 
 def get_output_path_interactive(current_dir):
     """Ask user for output path interactively"""
@@ -193,26 +258,34 @@ def get_patterns_file_interactive(default_path):
         while True:
             path_str = input("Patterns file path: ")
             path = Path(path_str)
-            if path.exists():
+            kind = _path_kind(path)
+            if kind == 'file':
                 # Copy file to config directory
-                shutil.copy(path, default_path)
+                shutil.copyfile(path, default_path)
                 print(f"Copied patterns from {path} to {default_path}")
                 return default_path
-            print(f"Error: File '{path}' does not exist. Please enter a valid path.")
+            if kind:
+                print(f"Error: '{path}' is not a file. Please enter a valid path.")
+            else:
+                print(f"Error: File '{path}' does not exist. Please enter a valid path.")
     
     # Create default patterns file
     create_default_patterns_file(default_path)
     return default_path
 
+# Cached result of probing for librosa (None until first checked)
+_LIBROSA_AVAILABLE = None
+
+def _librosa_available():
+    """Check whether librosa is installed without paying for importing it"""
+    global _LIBROSA_AVAILABLE
+    if _LIBROSA_AVAILABLE is None:
+        _LIBROSA_AVAILABLE = importlib.util.find_spec("librosa") is not None
+    return _LIBROSA_AVAILABLE
+
 def get_audio_analysis_preference():
     """Ask if user wants to enable audio analysis"""
-    try:
-        import librosa
-        audio_analysis_available = True
-    except ImportError:
-        audio_analysis_available = False
-    
-    if not audio_analysis_available:
+    if not _librosa_available():
         print("\n=== AUDIO ANALYSIS ===")
         print("Advanced audio analysis requires the librosa library, which is not installed.")
         print("Without this, classification will be based only on filenames and folder structure.")
@@ -226,96 +299,125 @@ def get_audio_analysis_preference():
     choice = input("Enable audio content analysis? (Y/n): ").strip().lower()
     return choice != 'n'
 
-def create_default_patterns_file(patterns_file):
-    """Create a default patterns file if none exists"""
-    default_patterns = {
-        "pattern_config": {
-            "wb": "(?:^|[_\\s-]|(?<=[a-z])(?=[A-Z])|(?<=[0-9])(?=[a-zA-Z]))",
-            "we": "(?:[_\\s-]|(?<=[A-Z])(?=[a-z])|$)",
-            "case_insensitive": "(?i)"
+# Default patterns, serialized once at import so writing them needs no encoding work
+_DEFAULT_PATTERNS = {
+    "pattern_config": {
+        "wb": "(?:^|[_\\s-]|(?<=[a-z])(?=[A-Z])|(?<=[0-9])(?=[a-zA-Z]))",
+        "we": "(?:[_\\s-]|(?<=[A-Z])(?=[a-z])|$)",
+        "case_insensitive": "(?i)"
+    },
+    "base_patterns": {
+        "LOOP": "loop|loops|phrase|phrases|groove|riff|adlib",
+        "ONE SHOT": "one[\\s_-]*shot|oneshot|single[\\s_-]*hit|hit|stab|accent|impact|tail|slam"
+    },
+    "categories": {
+        "VOCALS": {
+            "mainPatterns": [
+                "vox|vocal|vocals|voice|voices|adlib|hook|chant|groan|phrase|verse|stack|sing|sung|female|male"
+            ],
+            "subPatterns": {
+                "LOOP": "loop|loops|phrase|phrases|adlib|hook|chant|verse",
+                "ONE SHOT": "one[\\s_-]*shot|oneshot|single|vox|vocal|adlib|word"
+            }
         },
-        "base_patterns": {
-            "LOOP": "loop|loops|phrase|phrases|groove|riff|adlib",
-            "ONE SHOT": "one[\\s_-]*shot|oneshot|single[\\s_-]*hit|hit|stab|accent|impact|tail|slam"
+        "DRUMS": {
+            "mainPatterns": [
+                "drum|drums|kick|bd|bass[\\s_-]*drum|snare|hat|hihat|hi[\\s_-]*hat|hh|h[\\s_-]*h|clap|cymbal"
+            ],
+            "subPatterns": {
+                "KICK": "kick|bd|bass[\\s_-]*drum",
+                "SNARE": "snare",
+                "HAT": "hat|hihat|hi[\\s_-]*hat|hh|h[\\s_-]*h",
+                "CLAP": "clap",
+                "PERCUSSION": "percussion|perc|conga|bongo|rim|tambourine|shaker|cowbell",
+                "CRASH-RIDE": "crash|ride|cymbal"
+            }
         },
-        "categories": {
-            "VOCALS": {
-                "mainPatterns": [
-                    "vox|vocal|vocals|voice|voices|adlib|hook|chant|groan|phrase|verse|stack|sing|sung|female|male"
-                ],
-                "subPatterns": {
-                    "LOOP": "loop|loops|phrase|phrases|adlib|hook|chant|verse",
-                    "ONE SHOT": "one[\\s_-]*shot|oneshot|single|vox|vocal|adlib|word"
-                }
-            },
-            "DRUMS": {
-                "mainPatterns": [
-                    "drum|drums|kick|bd|bass[\\s_-]*drum|snare|hat|hihat|hi[\\s_-]*hat|hh|h[\\s_-]*h|clap|cymbal"
-                ],
-                "subPatterns": {
-                    "KICK": "kick|bd|bass[\\s_-]*drum",
-                    "SNARE": "snare",
-                    "HAT": "hat|hihat|hi[\\s_-]*hat|hh|h[\\s_-]*h",
-                    "CLAP": "clap",
-                    "PERCUSSION": "percussion|perc|conga|bongo|rim|tambourine|shaker|cowbell",
-                    "CRASH-RIDE": "crash|ride|cymbal"
-                }
-            },
-            "INSTRUMENTS": {
-                "mainPatterns": [
-                    "synth|pad|lead|arp|pluck|chord|stab|piano|guitar|keys|melody|melodic|fiddle|flute|bell"
-                ],
-                "subPatterns": {
-                    "CHORDS": "chord|chords|harmony|harmonies|progression",
-                    "PADS": "pad|pads|atmosphere|ambient|space|warm|soft",
-                    "STABS": "stab|stabs|hit|hits|accent|accents|impact",
-                    "SYNTH": "synth|synths|synthetic|electronic|digital|analog",
-                    "ACOUSTIC": "acoustic|unplugged|natural|organic|wood|wooden|string"
-                }
-            },
-            "BASS": {
-                "mainPatterns": [
-                    "bass(?:[\\s_-]?line)?|808|sub|sub[\\s_-]*bass|subbass"
-                ],
-                "subPatterns": {
-                    "LOOP": "loop|loops|phrase|phrases|groove|riff|bassline",
-                    "ONE SHOT": "one[\\s_-]*shot|oneshot|single|hit|stab|808|sub"
-                }
-            },
-            "FX": {
-                "mainPatterns": [
-                    "fx|effect|effects|impact|riser|down[\\s_-]*lifter|up[\\s_-]*lifter|drone|noise|sfx"
-                ],
-                "subPatterns": {
-                    "AMBIENT": "ambient|atmosphere|atmos|ambience|background|pad",
-                    "TEXTURE": "texture|textures|crusty|dirty|rough|smooth",
-                    "DRONE": "drone|drones|alien|cave",
-                    "LOOP": "loop|loops|phrase|phrases|groove|riff|sweep|whoosh",
-                    "ONE SHOT": "one[\\s_-]*shot|oneshot|single|hit|stab|impact"
-                }
+        "INSTRUMENTS": {
+            "mainPatterns": [
+                "synth|pad|lead|arp|pluck|chord|stab|piano|guitar|keys|melody|melodic|fiddle|flute|bell"
+            ],
+            "subPatterns": {
+                "CHORDS": "chord|chords|harmony|harmonies|progression",
+                "PADS": "pad|pads|atmosphere|ambient|space|warm|soft",
+                "STABS": "stab|stabs|hit|hits|accent|accents|impact",
+                "SYNTH": "synth|synths|synthetic|electronic|digital|analog",
+                "ACOUSTIC": "acoustic|unplugged|natural|organic|wood|wooden|string"
             }
         },
-        "classification_priority": {
-            "VOCALS": 5,
-            "DRUMS": 4,
-            "INSTRUMENTS": 3,
-            "BASS": 2,
-            "FX": 1,
-            "UNKNOWN": 0
+        "BASS": {
+            "mainPatterns": [
+                "bass(?:[\\s_-]?line)?|808|sub|sub[\\s_-]*bass|subbass"
+            ],
+            "subPatterns": {
+                "LOOP": "loop|loops|phrase|phrases|groove|riff|bassline",
+                "ONE SHOT": "one[\\s_-]*shot|oneshot|single|hit|stab|808|sub"
+            }
+        },
+        "FX": {
+            "mainPatterns": [
+                "fx|effect|effects|impact|riser|down[\\s_-]*lifter|up[\\s_-]*lifter|drone|noise|sfx"
+            ],
+            "subPatterns": {
+                "AMBIENT": "ambient|atmosphere|atmos|ambience|background|pad",
+                "TEXTURE": "texture|textures|crusty|dirty|rough|smooth",
+                "DRONE": "drone|drones|alien|cave",
+                "LOOP": "loop|loops|phrase|phrases|groove|riff|sweep|whoosh",
+                "ONE SHOT": "one[\\s_-]*shot|oneshot|single|hit|stab|impact"
+            }
         }
+    },
+    "classification_priority": {
+        "VOCALS": 5,
+        "DRUMS": 4,
+        "INSTRUMENTS": 3,
+        "BASS": 2,
+        "FX": 1,
+        "UNKNOWN": 0
     }
-    
-    # Save to file
-    with open(patterns_file, 'w') as f:
-        json.dump(default_patterns, f, indent=4)
+}
+_DEFAULT_PATTERNS_BYTES = _json_bytes(_DEFAULT_PATTERNS)
+
+def create_default_patterns_file(patterns_file):
+    """Create a default patterns file if none exists"""
+    _write_atomic(patterns_file, _DEFAULT_PATTERNS_BYTES)
     
     logging.info(f"Created default patterns file at {patterns_file}")
 
+def _is_validated(marker_file, digest):
+    """Check whether a previous validation recorded the same patterns file hash"""
+    try:
+        return Path(marker_file).read_text(errors="ignore") == digest
+    except OSError:
+        return False
+
+def _mark_validated(marker_file, digest):
+    """Record the hash of a patterns file that passed validation"""
+    try:
+        _write_atomic(marker_file, digest.encode('utf-8'))
+    except OSError as e:
+        logging.warning(f"Could not record validated patterns: {e}")
+
+def _as_str(value):
+    """Convert a pattern value to str (decoding bytes as UTF-8)"""
+    if type(value) is str:
+        return value
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode('utf-8')
+    return str(value)
+
 def validate_patterns_file(patterns_file):
-    """Validate the patterns file structure"""
+    """Validate the patterns file structure and return the parsed patterns"""
     try:
-        with open(patterns_file) as f:
-            patterns = json.load(f)
+        raw = Path(patterns_file).read_bytes()
+        patterns = _parse_json(raw)
+        
+        # Skip validation entirely if this exact content was validated before
+        digest = hashlib.blake2b(raw).hexdigest()
+        marker_file = Path(patterns_file).with_suffix('.validated')
+        if _is_validated(marker_file, digest):
+            logging.info(f"Patterns validation cache hit: {patterns_file}")
+            return patterns
         
         # Check required sections
         required_sections = ["pattern_config", "base_patterns", "categories"]
@@ -331,28 +433,28 @@ def validate_patterns_file(patterns_file):
                 logging.error(f"Missing required config '{config}' in pattern_config")
                 sys.exit(1)
         
-        # Validate regex patterns (check syntax only)
-        try:
-            for section in ["base_patterns", "categories"]:
-                if section == "base_patterns":
-                    for name, pattern in patterns[section].items():
-                        # Convert to string if needed
-                        if not isinstance(pattern, str):
-                            pattern = str(pattern) if not isinstance(pattern, (bytes, bytearray)) else pattern.decode('utf-8')
-                        re.compile(pattern)
-                elif section == "categories":
-                    for category, data in patterns[section].items():
-                        if "mainPatterns" in data:
-                            for pattern in data["mainPatterns"]:
-                                # Convert to string if needed
-                                if not isinstance(pattern, str):
-                                    pattern = str(pattern) if not isinstance(pattern, (bytes, bytearray)) else pattern.decode('utf-8')
-                                re.compile(pattern)
-            
-            logging.info(f"Patterns file validated: {patterns_file}")
-        except re.error as e:
-            logging.error(f"Invalid regex pattern in file {patterns_file}: {e}")
-            sys.exit(1)
+        # Gather every regex pattern by name, normalized to str once up front
+        named_patterns = {name: _as_str(pattern) for name, pattern in patterns["base_patterns"].items()}
+        for category, data in patterns["categories"].items():
+            if "mainPatterns" in data:
+                for index, pattern in enumerate(data["mainPatterns"]):
+                    named_patterns[f"{category}/mainPatterns/{index}"] = _as_str(pattern)
+        
+        # Validate regex patterns (check syntax only), compiling each distinct pattern once
+        checked = set()
+        for name, pattern in named_patterns.items():
+            if pattern not in checked:
+                try:
+                    re.compile(pattern)
+                except re.error as e:
+                    logging.error(f"Invalid regex pattern '{name}' in file {patterns_file}: {e}")
+                    sys.exit(1)
+                checked.add(pattern)
+        
+        logging.info(f"Patterns file validated: {patterns_file}")
+        
+        _mark_validated(marker_file, digest)
+        return patterns
         
     except json.JSONDecodeError:
         logging.error(f"Invalid JSON in patterns file: {patterns_file}")
@@ -361,32 +463,32 @@ def validate_patterns_file(patterns_file):
         logging.error(f"Error validating patterns file: {e}")
         sys.exit(1)
 
-def create_category_directories(patterns_file, output_dir):
-    """Create category directories based on the folder_structure in the patterns file"""
-    with open(patterns_file) as f:
-        patterns = json.load(f)
-    
-    # Get folder structure from patterns file
+def create_category_directories(patterns, output_dir):
+    """Create category directories based on the folder_structure of the parsed patterns"""
+    # Get folder structure from patterns
     folder_structure = patterns.get("folder_structure", {})
     
-    # Function to recursively build paths
-    def build_paths(structure, current_path=""):
+    # Build leaf paths depth-first with an explicit stack, keeping each path as a
+    # tuple of parts and joining it only once at the leaf
+    def build_paths(structure):
         paths = []
-        if isinstance(structure, dict):
-            for key, value in structure.items():
-                new_path = f"{current_path}/{key}" if current_path else key
-                if value:  # If it has children
-                    paths.extend(build_paths(value, new_path))
+        leaf = object()
+        stack = [(structure, ())]
+        while stack:
+            node, parts = stack.pop()
+            if isinstance(node, dict):
+                # Push in reverse so keys pop in their original order; keys without children are leaves
+                for key, value in reversed(node.items()):
+                    stack.append((value if value else leaf, parts + (key,)))
+            elif isinstance(node, list):
+                if node:
+                    for item in node:
+                        paths.append("/".join(parts + (item,)))
                 else:
-                    paths.append(new_path)
-        elif isinstance(structure, list):
-            if structure:  # If the list has items
-                for item in structure:
-                    new_path = f"{current_path}/{item}" if current_path else item
-                    paths.append(new_path)
-            else:
-                # If the list is empty, just add the current path
-                paths.append(current_path)
+                    # If the list is empty, just add the current path
+                    paths.append("/".join(parts))
+            elif node is leaf:
+                paths.append("/".join(parts))
         return paths
     
     # Build all paths
@@ -395,10 +497,37 @@ def create_category_directories(patterns_file, output_dir):
     # Add reports directory
     folder_paths.append("reports")
     
-    # Create all directories
-    for folder_path in folder_paths:
-        full_path = output_dir / folder_path
-        full_path.mkdir(parents=True, exist_ok=True)
+    # Skip creation entirely if this exact set of directories was created here before
+    unique_paths = sorted(set(folder_paths))
+    digest = hashlib.blake2b(repr(unique_paths).encode('utf-8')).hexdigest()
+    marker = output_dir / ".categories.ok"
+    try:
+        if marker.read_text(errors="ignore") == digest:
+            logging.info(f"Categories unchanged in {output_dir}, skipping directory creation")
+            return folder_paths
+    except OSError:
+        pass
+    
+    # Create all directories in sorted order so parents come first; try mkdir straight
+    # away instead of stat-ing first, and never revisit a directory made in this pass
+    created = set()
+    for folder_path in unique_paths:
+        parts = folder_path.split('/')
+        for depth in range(1, len(parts) + 1):
+            prefix = '/'.join(parts[:depth])
+            if prefix in created:
+                continue
+            path = output_dir / prefix
+            try:
+                os.mkdir(path)
+            except FileExistsError:
+                pass
+            except FileNotFoundError:
+                # The output directory itself is missing
+                path.mkdir(parents=True, exist_ok=True)
+            created.add(prefix)
+    
+    _write_atomic(marker, digest.encode('utf-8'))
     
     logging.info(f"Created {len(folder_paths)} directories in {output_dir}")
     print(f"Created {len(folder_paths)} category directories")
@@ -458,8 +587,28 @@ def get_cache_settings_interactive():
         "save_interval": 60
     }
 
-def create_config_file(config_dir, source_path, output_dir, patterns_file, threads, enable_audio_analysis=False):
-    """Create a config file for the organizer"""
+def summarize_patterns(patterns):
+    """Build the compact patterns summary embedded in config.json
+    
+    Holds category names, priorities, subcategories and the folder structure, so
+    tools that only need those never have to load the regex bodies in patterns.json.
+    """
+    priorities = patterns.get("classification_priority", {})
+    return {
+        "categories": {
+            name: {
+                "priority": priorities.get(name, 0),
+                "subcategories": list(data.get("subPatterns", {}).keys())
+            }
+            for name, data in patterns.get("categories", {}).items()
+        },
+        "classification_priority": priorities,
+        "folder_structure": patterns.get("folder_structure", {})
+    }
+
+def create_config_file(config_dir, source_path, output_dir, patterns_file, threads, enable_audio_analysis=False,
+                       patterns=None):
+    """Create a config file for the organizer and return its path"""
     # Get cache settings if interactive mode
     if interactive_mode:
         cache_settings = get_cache_settings_interactive()
@@ -479,6 +628,7 @@ def create_config_file(config_dir, source_path, output_dir, patterns_file, threa
         "output_path": str(output_dir),
         "patterns_file": str(patterns_file),
         "threads": threads if threads > 0 else os.cpu_count(),
+        "parallel_backend": "process",
         "process_subfolders": True,
         "overwrite_existing": False,
         "move_files": False,
@@ -494,11 +644,15 @@ def create_config_file(config_dir, source_path, output_dir, patterns_file, threa
         "cache_settings": cache_settings
     }
     
+    # Embed the lightweight part of the patterns; patterns_file stays the pointer to the full file
+    if patterns is not None:
+        config["patterns_summary"] = summarize_patterns(patterns)
+    
     config_file = config_dir / "config.json"
-    with open(config_file, 'w') as f:
-        json.dump(config, f, indent=4)
+    _dump_json(config, config_file)
     
     logging.info(f"Created config file at {config_file}")
+    return config_file
 
 if __name__ == "__main__":
     setup_project()
\ No newline at end of file